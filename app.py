@@ -1,10 +1,46 @@
 from flask import Flask, render_template_string, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from routes import api_blueprint
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Largest request body accepted (bytes); the API only takes short JSON queries
+MAX_CONTENT_LENGTH = 64 * 1024
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+    
+    jsonify() and request.json go through the app's JSON provider, so swapping it
+    speeds up every endpoint without changing the views. Keys are still sorted
+    unless sort_keys is turned off, and indent (debug mode) is rendered as 2 spaces.
+    """
+    
+    def dumps(self, obj, **kwargs):
+        """Serialize data as a JSON string."""
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=kwargs.get("default", self.default), option=option).decode()
+    
+    def loads(self, s, **kwargs):
+        """Deserialize data from a JSON string or bytes."""
+        return orjson.loads(s)
+
 def create_app():
     """Create and configure the Flask application."""
     app = Flask(__name__)
+    app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+    
+    # Use the faster orjson for request and response bodies when it is installed
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
     
     # Enable CORS for all routes and origins
     CORS(app)
@@ -104,6 +140,7 @@ def create_app():
                     <h3>Search Endpoint</h3>
                     <code>POST /api/search</code>
                     <p>Body: {"query": "Your search query here"}</p>
+                    <p>Send <code>Accept: text/event-stream</code> to receive the answer as server-sent events while it is written.</p>
                     
                     <h3>Calendar Schedule Endpoint</h3>
                     <code>POST /api/calendar/schedule</code>
@@ -112,6 +149,7 @@ def create_app():
                     <h3>Education Guidance Endpoint</h3>
                     <code>POST /api/education</code>
                     <p>Body: {"query": "What courses should I take to become a data scientist?"}</p>
+                    <p>Send <code>Accept: text/event-stream</code> to receive the answer as server-sent events while it is written.</p>
                 </div>
             </div>
         </body>
@@ -122,6 +160,14 @@ def create_app():
     def page_not_found(e):
         return jsonify({"error": "Endpoint not found"}), 404
     
+    @app.errorhandler(405)
+    def method_not_allowed(e):
+        return jsonify({"error": "Method not allowed"}), 405, {"Allow": ", ".join(e.valid_methods or ())}
+    
+    @app.errorhandler(413)
+    def request_too_large(e):
+        return jsonify({"error": "Request body too large"}), 413
+    
     @app.errorhandler(500)
     def server_error(e):
         return jsonify({"error": "Internal server error"}), 500
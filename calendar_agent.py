@@ -11,7 +11,7 @@ import io
 import re
 import time
 from contextlib import redirect_stdout
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from dotenv import load_dotenv
 from agno.agent import Agent
 from agno.models.azure import AzureOpenAI
@@ -25,6 +25,46 @@ load_dotenv()
 # Regular expression to strip ANSI escape sequences
 ANSI_ESCAPE_PATTERN = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
 
+# Patterns used to pull the response out of the agent's formatted output
+RESPONSE_SECTION_PATTERN = re.compile(r'Response.*?\n\u2503(.*?)\u2517', re.DOTALL)
+BOX_LINE_START_PATTERN = re.compile(r'\n\u2503\s*')
+BOX_LINE_END_PATTERN = re.compile(r'\s*\u2503\s*$', re.MULTILINE)
+BOX_DRAWING_PATTERN = re.compile(r'[\u2500-\u257F]')
+MULTISPACE_PATTERN = re.compile(r'\s{2,}')
+
+# Words signalling each calendar action, in priority order when several appear
+CALENDAR_INTENTS = {
+    "add": ("add", "create", "schedule"),
+    "edit": ("edit", "update", "change"),
+    "delete": ("delete", "remove", "cancel"),
+    "view": ("show", "view", "list")
+}
+_INTENT_PRIORITY = tuple(CALENDAR_INTENTS)
+
+# All intent words in one case-insensitive pattern, with a named group per intent;
+# matched anywhere in a word, like the substring checks it replaces. The lookahead
+# tries every position, so overlapping words ("deletedit") are all found
+_INTENT_RE = re.compile(
+    '(?=' + '|'.join(f"(?P<{intent}>" + '|'.join(words) + ")" for intent, words in CALENDAR_INTENTS.items()) + ')',
+    re.IGNORECASE | re.ASCII
+)
+
+def detect_calendar_intent(query: str) -> Optional[str]:
+    """
+    Determine which calendar action a query asks for, in one pass over the query.
+    
+    Args:
+        query: The user's calendar request
+        
+    Returns:
+        "add", "edit", "delete" or "view", or None if no action word is present
+    """
+    found = {match.lastgroup for match in _INTENT_RE.finditer(query)}
+    for intent in _INTENT_PRIORITY:
+        if intent in found:
+            return intent
+    return None
+
 def strip_ansi_escape_sequences(text):
     """Remove ANSI escape sequences from text."""
     return ANSI_ESCAPE_PATTERN.sub('', text)
@@ -35,20 +75,20 @@ def extract_important_content(text):
     clean_text = strip_ansi_escape_sequences(text)
     
     # Look for the response section
-    response_match = re.search(r'Response.*?\n\u2503(.*?)\u2517', clean_text, re.DOTALL)
+    response_match = RESPONSE_SECTION_PATTERN.search(clean_text)
     if response_match:
         content = response_match.group(1)
         # Remove the box drawing characters at line beginnings and ends
-        content = re.sub(r'\n\u2503\s*', '\n', content)
-        content = re.sub(r'\s*\u2503\s*$', '', content, flags=re.MULTILINE)
+        content = BOX_LINE_START_PATTERN.sub('\n', content)
+        content = BOX_LINE_END_PATTERN.sub('', content)
         # Clean up extra whitespace
         content = content.strip()
         return content
     
     # If we couldn't find the response section with the pattern above,
     # try a simpler approach - just remove all box drawing characters
-    clean_text = re.sub(r'[\u2500-\u257F]', '', clean_text)
-    clean_text = re.sub(r'\s{2,}', ' ', clean_text)
+    clean_text = BOX_DRAWING_PATTERN.sub('', clean_text)
+    clean_text = MULTISPACE_PATTERN.sub(' ', clean_text)
     return clean_text.strip()
 
 class CalendarAgent:
@@ -205,22 +245,19 @@ class CalendarAgent:
             print(f"OpenAI setup failed: {str(e)}")
             return None
     
+    # Prefixes that make a request's calendar action explicit to the model
+    _INTENT_PREFIXES = {
+        "add": "Add this event to my calendar: ",
+        "edit": "Update this calendar event: ",
+        "delete": "Delete this calendar event: ",
+        "view": "Show my calendar events: "
+    }
+    
     def _enhance_calendar_query(self, query: str) -> str:
         """Enhance user query to be more specific for calendar operations."""
-        query_lower = query.lower()
-        
-        if "add" in query_lower or "create" in query_lower or "schedule" in query_lower:
-            if "calendar" not in query_lower:
-                query = f"Add this event to my calendar: {query}"
-        elif "edit" in query_lower or "update" in query_lower or "change" in query_lower:
-            if "calendar" not in query_lower:
-                query = f"Update this calendar event: {query}"
-        elif "delete" in query_lower or "remove" in query_lower or "cancel" in query_lower:
-            if "calendar" not in query_lower:
-                query = f"Delete this calendar event: {query}"
-        elif "show" in query_lower or "view" in query_lower or "list" in query_lower:
-            if "calendar" not in query_lower:
-                query = f"Show my calendar events: {query}"
+        intent = detect_calendar_intent(query)
+        if intent is not None and "calendar" not in query.lower():
+            query = self._INTENT_PREFIXES[intent] + query
                 
         return query
     
@@ -271,10 +308,26 @@ class CalendarAgent:
         Returns:
             Response containing the list of events or an error message
         """
-        return self.get_response(f"Show my calendar events for {time_period}")
+        return self.list_events_result(time_period)[0]
+    
+    def list_events_result(self, time_period: str = "today") -> Tuple[str, bool]:
+        """List events like list_events, also telling whether the listing came from the calendar."""
+        return self.get_result(f"Show my calendar events for {time_period}")
     
     def get_response(self, query: str) -> str:
         """Get a response from the calendar agent for the given query."""
+        return self.get_result(query)[0]
+    
+    def get_result(self, query: str) -> Tuple[str, bool]:
+        """
+        Get a response from the calendar agent along with whether it came from the agent.
+        
+        Args:
+            query: The calendar request
+            
+        Returns:
+            (response, is_real): is_real is False for the mock response and error messages
+        """
         # Add user message to memory
         memory_manager.add_user_message(self.agent_id, query)
         
@@ -282,7 +335,7 @@ class CalendarAgent:
             # Fall back to mock implementation if real agent isn't available
             response = self._mock_response(query)
             memory_manager.add_ai_message(self.agent_id, response)
-            return response
+            return response, False
             
         try:
             # Get conversation history for context
@@ -306,18 +359,18 @@ class CalendarAgent:
             
             # Add the response to memory
             memory_manager.add_ai_message(self.agent_id, clean_response)
-            return clean_response
+            return clean_response, True
         except Exception as e:
             print(f"Error using calendar agent: {str(e)}")
             error_msg = f"I encountered an error while trying to manage your calendar: {str(e)}\n\nPlease check your Google Calendar permissions and try again."
             # Don't add error responses to memory
-            return error_msg
+            return error_msg, False
     
     def _mock_response(self, query: str) -> str:
         """Provide a mock calendar response when real calendar isn't available."""
-        query_lower = query.lower()
+        intent = detect_calendar_intent(query)
         
-        if "add" in query_lower or "create" in query_lower or "schedule" in query_lower:
+        if intent == "add":
             return f"""# Calendar Event Created ✅
 
 ## Event Details
@@ -328,7 +381,7 @@ class CalendarAgent:
 The event has been successfully added to your calendar.
 
 Would you like to set a reminder for this event?"""
-        elif "edit" in query_lower or "update" in query_lower or "change" in query_lower:
+        elif intent == "edit":
             return f"""# Calendar Event Updated ✅
 
 ## Updated Event Details
@@ -338,13 +391,13 @@ Would you like to set a reminder for this event?"""
 Your calendar has been successfully updated.
 
 Is there anything else you'd like to modify about this event?"""
-        elif "delete" in query_lower or "remove" in query_lower or "cancel" in query_lower:
+        elif intent == "delete":
             return f"""# Calendar Event Deleted ✅
 
 The event "{query.split("delete")[1].strip() if "delete" in query else query.split("remove")[1].strip() if "remove" in query else query.split("cancel")[1].strip() if "cancel" in query else "Unknown Event"}" has been removed from your calendar.
 
 Would you like me to help you schedule a different event?"""
-        elif "show" in query_lower or "list" in query_lower or "view" in query_lower:
+        elif intent == "view":
             time_period = query.split("for")[-1].strip() if "for" in query else "today"
             return f"""# Calendar Events for {time_period}
 
@@ -399,6 +452,10 @@ def list_calendar_events(time_period: str = "today") -> str:
     """List events on Google Calendar for a specified time period."""
     return calendar_agent.list_events(time_period)
 
+def list_calendar_events_result(time_period: str = "today") -> Tuple[str, bool]:
+    """List events like list_calendar_events; the flag is False for mock or error responses."""
+    return calendar_agent.list_events_result(time_period)
+
 def process_calendar_query(query: str) -> str:
     """Process a general query related to calendar management."""
     return calendar_agent.get_response(query)
@@ -6,74 +6,183 @@ This file implements a team of specialized agents that work together to provide
 career guidance and course recommendations.
 
 Team structure:
-- Team Leader: Coordinates subtasks and synthesizes final responses
+- Team Leader: Synthesizes the specialists' answers into the final response
 - Career Guidance Agent: Provides career path advice and job market insights
 - Course Recommender Agent: Recommends specific courses using search capabilities
 """
 import os
-import io
 import re
+import asyncio
+import functools
+import importlib.util
+import random
 import time  # Added import for retry mechanism
-import urllib.parse
-from contextlib import redirect_stdout
-from typing import Optional, List, Dict, Any
+import threading
+from typing import Optional
+from datetime import datetime
 from dotenv import load_dotenv
-from agno.agent import Agent
-from agno.models.azure import AzureOpenAI
-from agno.models.openai.chat import OpenAIChat
-from agno.team import Team
-from agno.tools.googlesearch import GoogleSearchTools
-from simple_search_agent import get_search_response
-from datetime import datetime, timedelta
-from university_course_recommender import UniversityCourseRecommender, get_university_courses, get_university_info, get_personalized_recommendations
-
-# Common university domain suffixes
-UNIVERSITY_DOMAINS = ['.edu', '.ac.uk', '.edu.au', '.ac.', '.uni', 'university', 'college']
-
-# Load environment variables
+from response_cache import ResponseCache, normalize_query
+
+# Load environment variables (variables already set in the environment take precedence)
 load_dotenv()
 
 # Regular expression to strip ANSI escape sequences
 ANSI_ESCAPE_PATTERN = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
 
 # Common university domain patterns to help identify university websites
-UNIVERSITY_DOMAINS = [
-    '.edu', 
-    '.ac.uk', 
+UNIVERSITY_DOMAINS = (
+    '.edu',
+    '.ac.uk',
     '.edu.au',
     '.ac.nz',
     '.edu.sg',
     '.edu.in',
     '.ac.jp',
     '.edu.cn'
-]
+)
+
+# Alternation of the university domain suffixes, for building website patterns
+_DOMAIN_ALT = '|'.join(re.escape(d) for d in UNIVERSITY_DOMAINS)
+
+# Whether the agno framework is installed. Checked without importing it, so the heavy
+# import still only happens when an agent is first built
+AGNO_AVAILABLE = importlib.util.find_spec("agno") is not None
+if not AGNO_AVAILABLE:
+    print("agno is not installed. Education guidance will use mock responses.")
+
+# HTTP status codes that indicate a transient provider failure worth retrying
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Set SKIP_MODEL_HEALTHCHECK=1 to trust the configured credentials instead of spending a
+# live LLM call on a test prompt whenever a model is created
+SKIP_MODEL_HEALTHCHECK = os.getenv("SKIP_MODEL_HEALTHCHECK") == "1"
+
+# Maximum number of searches a single fan-out keeps in flight, to stay under provider rate limits
+SEARCH_CONCURRENCY = int(os.getenv("SEARCH_CONCURRENCY", "8"))
+
+# Seconds to wait for each specialist before the leader answers without it
+SPECIALIST_TIMEOUT = float(os.getenv("SPECIALIST_TIMEOUT", "90"))
+
+# How long (seconds) and how many team answers are reused for equivalent questions
+GUIDANCE_CACHE_TTL = int(os.getenv("GUIDANCE_CACHE_TTL", "3600"))
+GUIDANCE_CACHE_SIZE = 256
 
-# List of university keywords to identify when a university is mentioned
-UNIVERSITY_KEYWORDS = [
-    'university', 
-    'college', 
+# University keywords to identify when a university is mentioned, checked in this order
+UNIVERSITY_KEYWORDS = (
+    'university',
+    'college',
     'institute of technology',
     'polytechnic',
     'academy',
     'school of'
+)
+
+# Websites of common universities, keyed by the name used to recognise them
+KNOWN_UNIVERSITY_WEBSITES = {
+    "harvard": "https://www.harvard.edu",
+    "stanford": "https://www.stanford.edu",
+    "mit": "https://www.mit.edu",
+    "yale": "https://www.yale.edu",
+    "princeton": "https://www.princeton.edu",
+    "oxford": "https://www.ox.ac.uk",
+    "cambridge": "https://www.cam.ac.uk",
+    "berkeley": "https://www.berkeley.edu",
+    "caltech": "https://www.caltech.edu",
+    "columbia": "https://www.columbia.edu"
+}
+
+# One alternation over all known names (longest first), so lookup is a single scan of the
+# name however many universities are listed; \b stops "mit" matching inside "smith"
+_KNOWN_UNIVERSITY_RE = re.compile(
+    r'\b(?:' + '|'.join(re.escape(key) for key in sorted(KNOWN_UNIVERSITY_WEBSITES, key=len, reverse=True)) + r')\b'
+)
+
+# Per-keyword patterns used by extract_university_name, compiled once at import time
+_KEYWORD_PATTERNS = [
+    (keyword, re.compile(rf'{re.escape(keyword)}\s+of\s+([a-z\s]+)|\b{re.escape(keyword)}\s+([a-z\s]+)'))
+    for keyword in UNIVERSITY_KEYWORDS
 ]
 
-def strip_ansi_escape_sequences(text):
+# An http(s) URL whose text contains one of UNIVERSITY_DOMAINS (in any case), so a
+# single scan both finds URLs and filters out non-university ones
+_UNIVERSITY_URL_RE = re.compile(r'https?://\S*?(?i:' + _DOMAIN_ALT + r')\S*')
+
+# Generic words dropped when guessing a domain from a university name
+_UNI_STRIP_RE = re.compile(r' university|university of | college| institution')
+
+# str.translate tables deleting separators from names and URLs before comparing them
+_NAME_DELETE_TABLE = str.maketrans('', '', ' -.')
+_URL_DELETE_TABLE = str.maketrans('', '', '.-/')
+
+# Patterns used by extract_important_content, compiled once at import time
+BOX_LINE_START_PATTERN = re.compile(r'\n\u2503\s*')
+BOX_LINE_END_PATTERN = re.compile(r'\s*\u2503\s*$', re.MULTILINE)
+# str.translate table deleting the whole Unicode box drawing block (U+2500-U+257F)
+BOX_DRAWING_TABLE = dict.fromkeys(range(0x2500, 0x2580))
+# Inline markdown in one alternation; each span keeps its text in a group, link targets,
+# bare [references] and heading markers are dropped
+INLINE_MARKDOWN_PATTERN = re.compile(
+    r'\*\*\*([^*]+)\*\*\*'      # bold italic
+    r'|\*\*([^*]+)\*\*'         # bold
+    r'|\*([^*]+)\*'             # italic
+    r'|`([^`]+)`'               # code
+    r'|#+\s+'                   # heading marker
+    r'|\[([^\]]+)\]\([^\)]+\)'  # [text](url)
+    r'|\]\([^\)]+\)'            # stray link target
+    r'|\[[^\]]+\]'              # [reference]
+)
+MULTISPACE_PATTERN = re.compile(r'\s{2,}')
+FORMATTING_LINE_PATTERN = re.compile(r'^\s*[-•=]+\s*$', re.MULTILINE)
+BULLET_PATTERN = re.compile(r'^\s*[•]\s*', re.MULTILINE)
+BLANK_LINES_PATTERN = re.compile(r'\n{3,}')
+
+def _keep_marked_text(match: re.Match) -> str:
+    """Substitution for INLINE_MARKDOWN_PATTERN: the marked-up text, or '' for markers without any.
+    
+    The kept text is cleaned as well, so markers nested inside a span (a heading inside
+    an italic run, bold inside code) are still removed.
+    """
+    if not match.lastindex:
+        return ''
+    return INLINE_MARKDOWN_PATTERN.sub(_keep_marked_text, match.group(match.lastindex))
+
+def strip_ansi_escape_sequences(text: str) -> str:
     """Remove ANSI escape sequences from text."""
     return ANSI_ESCAPE_PATTERN.sub('', text)
 
-def extract_important_content(text):
-    """Extract only the important content from the formatted response and convert to plain text."""
+def _find_response_section(text: str) -> Optional[str]:
+    """Return the body of the "Response" panel, or None if there is no such panel.
+
+    Equivalent to matching r'Response.*?\\n\u2503(.*?)\u2517' with DOTALL, but done with
+    three str.find calls so it runs in linear time regardless of the model output.
+    """
+    start = text.find('Response')
+    if start == -1:
+        return None
+    body_start = text.find('\n\u2503', start + len('Response'))
+    if body_start == -1:
+        return None
+    body_start += 2
+    body_end = text.find('\u2517', body_start)
+    if body_end == -1:
+        return None
+    return text[body_start:body_end]
+
+def extract_important_content(text: str) -> str:
+    """Extract only the important content from the formatted response and convert to plain text.
+    
+    The function is fully type-annotated and only uses precompiled patterns, so the
+    module can be compiled with mypyc for deployments where this cleanup is hot.
+    """
     # First remove ANSI escape sequences
     clean_text = strip_ansi_escape_sequences(text)
     
     # Look for the response section
-    response_match = re.search(r'Response.*?\n\u2503(.*?)\u2517', clean_text, re.DOTALL)
-    if response_match:
-        content = response_match.group(1)
+    content = _find_response_section(clean_text)
+    if content is not None:
         # Remove the box drawing characters at line beginnings and ends
-        content = re.sub(r'\n\u2503\s*', '\n', content)
-        content = re.sub(r'\s*\u2503\s*$', '', content, flags=re.MULTILINE)
+        content = BOX_LINE_START_PATTERN.sub('\n', content)
+        content = BOX_LINE_END_PATTERN.sub('', content)
         # Clean up extra whitespace
         content = content.strip()
     else:
@@ -82,54 +191,69 @@ def extract_important_content(text):
         content = clean_text
     
     # Remove all Unicode box drawing characters
-    content = re.sub(r'[\u2500-\u257F]', '', content)
+    content = content.translate(BOX_DRAWING_TABLE)
     
-    # Remove all markdown formatting symbols (but leave content)
-    content = re.sub(r'#+\s+', '', content)  # Remove heading markers
-    content = re.sub(r'\*\*([^*]+)\*\*', r'\1', content)  # Bold text
-    content = re.sub(r'\*([^*]+)\*', r'\1', content)  # Italic text
-    content = re.sub(r'`([^`]+)`', r'\1', content)  # Code text
+    # Remove markdown formatting symbols (but leave content) and links in a single pass
+    content = INLINE_MARKDOWN_PATTERN.sub(_keep_marked_text, content)
     
     # Convert multiple spaces to single space
-    content = re.sub(r'\s{2,}', ' ', content)
+    content = MULTISPACE_PATTERN.sub(' ', content)
     
     # Remove lines that only contain formatting or whitespace
-    content = re.sub(r'^\s*[-•=]+\s*$', '', content, flags=re.MULTILINE)
+    content = FORMATTING_LINE_PATTERN.sub('', content)
     
     # Convert bullet symbols to plain text
-    content = re.sub(r'^\s*[•]\s*', '- ', content, flags=re.MULTILINE)
-    
-    # Remove any URLs or links formatting
-    content = re.sub(r'\]\([^\)]+\)', '', content)
-    content = re.sub(r'\[[^\]]+\]', '', content)
+    content = BULLET_PATTERN.sub('- ', content)
     
     # Clean up any remaining formatting or special characters
     content = content.replace('\u2022', '-')  # Replace bullet points with simple dash
     
     # Final cleanup of multiple blank lines
-    content = re.sub(r'\n{3,}', '\n\n', content)
+    content = BLANK_LINES_PATTERN.sub('\n\n', content)
     
     return content.strip()
 
+# First model that passed its connection check; shared by every agent in the process
+_best_model = None
+_best_model_lock = threading.Lock()
+
 def get_best_available_model():
-    """Get the best available model for our agents."""
-    # Try Azure OpenAI first
-    azure_model = _get_azure_model()
-    if azure_model:
-        return azure_model
-        
-    # Then try standard OpenAI
-    openai_model = _get_openai_model()
-    if openai_model:
-        return openai_model
-        
-    # Return None if no models are available
-    print("No language models available. Will use mock responses.")
-    return None
+    """
+    Get the best available model for our agents.
+    
+    The first successful result is memoized, so the connection probes run once per
+    process instead of once per agent. A failed lookup is not cached, so a later call
+    can still pick up a provider that was briefly unavailable.
+    """
+    global _best_model
+    if _best_model is not None:
+        return _best_model
+    if not AGNO_AVAILABLE:
+        return None
+    
+    with _best_model_lock:
+        if _best_model is None:
+            _best_model = _probe_best_model()
+    
+    if _best_model is None:
+        print("No language models available. Will use mock responses.")
+    return _best_model
+
+def _probe_best_model():
+    """Probe Azure OpenAI first, and standard OpenAI only if Azure isn't available."""
+    # Each probe sends a live test message, so OpenAI isn't called when Azure answers
+    return _get_azure_model() or _get_openai_model()
+
+def _probe_backoff(attempt):
+    """Seconds to wait before retrying a connection probe: exponential, capped, with jitter."""
+    return min(2 ** attempt, 10) + random.uniform(0, 0.5)
 
 def _get_azure_model():
     """Initialize Azure OpenAI model with improved error handling."""
     try:
+        from agno.agent import Agent
+        from agno.models.azure import AzureOpenAI
+
         api_key = os.getenv("AZURE_OPENAI_API_KEY")
         endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
         deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o")
@@ -155,17 +279,23 @@ def _get_azure_model():
                     id=deployment
                 )
                 
-                # Simple test with minimal content to verify connection
+                if SKIP_MODEL_HEALTHCHECK:
+                    return model
+                
+                # Simple test with minimal content to verify connection. Agent.run does
+                # not print, so the probe needs no (process-wide) stdout redirection and
+                # can run alongside the other provider's probe
                 test_agent = Agent(model=model)
-                with io.StringIO() as f:
-                    with redirect_stdout(f):
-                        test_agent.print_response("Test")
-                        
+                test_agent.run("Test")
+                
                 print("Successfully connected to Azure OpenAI API")
                 return model
             except Exception as e:
                 print(f"Azure OpenAI connection attempt {attempt+1}/3 failed: {str(e)}")
-                time.sleep(1)  # Wait between retries
+                if not _is_transient_error(e):
+                    break  # e.g. bad credentials, retrying won't help
+                if attempt < 2:
+                    time.sleep(_probe_backoff(attempt))
                 
         print("All Azure OpenAI connection attempts failed")
         return None
@@ -176,6 +306,9 @@ def _get_azure_model():
 def _get_openai_model():
     """Initialize standard OpenAI model with improved error handling."""
     try:
+        from agno.agent import Agent
+        from agno.models.openai.chat import OpenAIChat
+
         api_key = os.getenv("OPENAI_API_KEY")
         
         if not api_key:
@@ -189,17 +322,21 @@ def _get_openai_model():
             try:
                 model = OpenAIChat(api_key=api_key, id="gpt-3.5-turbo")
                 
+                if SKIP_MODEL_HEALTHCHECK:
+                    return model
+                
                 # Simple test with minimal content
                 test_agent = Agent(model=model)
-                with io.StringIO() as f:
-                    with redirect_stdout(f):
-                        test_agent.print_response("Test")
-                        
+                test_agent.run("Test")
+                
                 print("Successfully connected to OpenAI API")
                 return model
             except Exception as e:
                 print(f"OpenAI connection attempt {attempt+1}/3 failed: {str(e)}")
-                time.sleep(1)  # Wait between retries
+                if not _is_transient_error(e):
+                    break  # e.g. bad credentials, retrying won't help
+                if attempt < 2:
+                    time.sleep(_probe_backoff(attempt))
                 
         print("All OpenAI connection attempts failed")
         return None
@@ -207,10 +344,84 @@ def _get_openai_model():
         print(f"OpenAI setup failed: {str(e)}")
         return None
 
+# Cleaned team answers by (university, normalized query)
+_guidance_cache = ResponseCache(GUIDANCE_CACHE_SIZE, GUIDANCE_CACHE_TTL)
+
+def get_search_response(query):
+    """
+    Run a web search through the shared search agent.
+
+    simple_search_agent pulls in agno when imported, so it is only imported the
+    first time a search is actually needed. The search agent reuses its real
+    answers for repeated queries (the research helpers send the same
+    "<university> admission requirements" style queries on every turn) and never
+    caches its mock fallback.
+
+    Args:
+        query: The search query
+
+    Returns:
+        The cleaned search response
+    """
+    from simple_search_agent import get_search_response as _get_search_response
+    return _get_search_response(query)
+
+async def get_search_response_async(query):
+    """Async counterpart of get_search_response, used to fan out several searches at once."""
+    from simple_search_agent import get_search_response_async as _get_search_response_async
+    return await _get_search_response_async(query)
+
+# asyncio.Semaphore is tied to the event loop it is first used on, and the sync
+# wrappers start a fresh loop per call, so keep one semaphore per running loop
+_search_semaphores = {}
+_search_semaphores_lock = threading.Lock()
+
+def _get_search_semaphore():
+    """Return the search semaphore for the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _search_semaphores_lock:
+        semaphore = _search_semaphores.get(loop)
+        if semaphore is None:
+            # Forget semaphores of loops that asyncio.run has already closed
+            for stale_loop in [l for l in _search_semaphores if l.is_closed()]:
+                del _search_semaphores[stale_loop]
+            semaphore = _search_semaphores[loop] = asyncio.Semaphore(SEARCH_CONCURRENCY)
+        return semaphore
+
+async def _bounded_search(query):
+    """Run get_search_response_async with at most SEARCH_CONCURRENCY searches in flight."""
+    async with _get_search_semaphore():
+        return await get_search_response_async(query)
+
+def batch_search(queries):
+    """Synchronous wrapper around batch_search_async."""
+    return asyncio.run(batch_search_async(queries))
+
+async def batch_search_async(queries):
+    """
+    Run a batch of searches as one fan-out.
+
+    Repeated queries are searched once, concurrently; answers the search agent has
+    cached come back without a search.
+
+    Args:
+        queries: The search queries, possibly with duplicates
+
+    Returns:
+        A dict mapping each distinct query to its search response
+    """
+    unique_queries = list(dict.fromkeys(queries))
+    fetched = await asyncio.gather(*(_bounded_search(query) for query in unique_queries))
+    return dict(zip(unique_queries, fetched))
+
+@functools.lru_cache(maxsize=4096)
 def extract_university_name(query: str) -> str:
     """
     Extract university name from the query if one is mentioned.
     
+    Results are memoized, since the same query is looked at by the guidance cache,
+    the query enrichment and the mock fallback.
+    
     Args:
         query: The user's query string
     
@@ -220,10 +431,9 @@ def extract_university_name(query: str) -> str:
     query_lower = query.lower()
     
     # First check for university keywords followed by potential university names
-    for keyword in UNIVERSITY_KEYWORDS:
+    for keyword, pattern in _KEYWORD_PATTERNS:
         if keyword in query_lower:
-            pattern = rf'{keyword}\s+of\s+([a-z\s]+)|\b{keyword}\s+([a-z\s]+)'
-            match = re.search(pattern, query_lower)
+            match = pattern.search(query_lower)
             if match:
                 # Return the first non-empty group
                 for group in match.groups():
@@ -255,37 +465,43 @@ def get_university_website(university_name: str) -> str:
     # In a real implementation, this would use a database or API to look up the actual URL
     # For demonstration, we'll create a simplified domain based on the university name
     
-    # Dictionary of common universities and their domains
-    university_domains = {
-        "harvard": "https://www.harvard.edu",
-        "stanford": "https://www.stanford.edu",
-        "mit": "https://www.mit.edu",
-        "yale": "https://www.yale.edu",
-        "princeton": "https://www.princeton.edu",
-        "oxford": "https://www.ox.ac.uk",
-        "cambridge": "https://www.cam.ac.uk",
-        "berkeley": "https://www.berkeley.edu",
-        "caltech": "https://www.caltech.edu",
-        "columbia": "https://www.columbia.edu"
-    }
-    
     # Convert to lowercase and remove common words for matching
     simplified_name = university_name.lower()
     
-    # Check if the simplified name contains any of our known universities
-    for key, domain in university_domains.items():
-        if key in simplified_name:
-            return domain
+    # Check if the simplified name mentions any of our known universities
+    match = _KNOWN_UNIVERSITY_RE.search(simplified_name)
+    if match:
+        return KNOWN_UNIVERSITY_WEBSITES[match.group(0)]
     
     # If no match, create a plausible domain name from the university name
-    cleaned_name = simplified_name.replace(" university", "").replace("university of ", "")
-    cleaned_name = cleaned_name.replace(" college", "").replace(" institution", "")
-    cleaned_name = cleaned_name.replace(" ", "").replace("-", "").replace(".", "")
+    cleaned_name = _UNI_STRIP_RE.sub("", simplified_name).translate(_NAME_DELETE_TABLE)
     
     # Return a plausible URL
     return f"https://www.{cleaned_name}.edu"
 
+@functools.lru_cache(maxsize=512)
+def _get_website_re(university_name):
+    """
+    Build (once per university) the pattern matching that university's website.
+    
+    Args:
+        university_name: Lowercased, non-empty university name with single spaces
+    
+    Returns:
+        Compiled pattern whose single group is the matched website
+    """
+    words = [re.escape(word) for word in university_name.split(' ')]
+    return re.compile(
+        f"(?i)(?:https?://)?(?:www\\.)?("
+        f"{'[-.]?'.join(words)}[.-]?(?:{_DOMAIN_ALT})"
+        f"|(?:{_DOMAIN_ALT})/{'[-_]?'.join(words)})"
+    )
+
 def search_university_information(university_name, specific_query=None):
+    """Synchronous wrapper around search_university_information_async."""
+    return asyncio.run(search_university_information_async(university_name, specific_query))
+
+async def search_university_information_async(university_name, specific_query=None):
     """
     Enhanced search function for university information using multiple search sources.
     
@@ -307,31 +523,36 @@ def search_university_information(university_name, specific_query=None):
     else:
         detailed_query = f"{university_name} programs admissions rankings"
 
-    # Use our simple_search_agent that already includes Google Search and DuckDuckGo capabilities
-    base_results = get_search_response(base_query)
-    detailed_results = get_search_response(detailed_query)
+    # Use our simple_search_agent that already includes Google Search and DuckDuckGo capabilities;
+    # both searches are independent, so run them as one batch
+    results = await batch_search_async([base_query, detailed_query])
+    base_results = results[base_query]
+    detailed_results = results[detailed_query]
     
     # Combine and format the results
-    combined_info = f"Information about {university_name}:\n\n"
-    combined_info += f"General Information:\n{base_results}\n\n"
+    parts = [
+        f"Information about {university_name}:\n\n",
+        f"General Information:\n{base_results}\n\n"
+    ]
     
     if specific_query:
-        combined_info += f"Information about {specific_query} at {university_name}:\n{detailed_results}\n\n"
+        parts.append(f"Information about {specific_query} at {university_name}:\n{detailed_results}\n\n")
     else:
-        combined_info += f"Additional Details:\n{detailed_results}\n\n"
+        parts.append(f"Additional Details:\n{detailed_results}\n\n")
     
-    # Extract website URLs if available
-    website_pattern = f"(?i)(?:https?://)?(?:www\\.)?({university_name.lower().replace(' ', '[-.]?')}[.-]?(?:{'|'.join([d.replace('.', '\\.')  for d in UNIVERSITY_DOMAINS])})|(?:{'|'.join([d.replace('.', '\\.')  for d in UNIVERSITY_DOMAINS])})/{university_name.lower().replace(' ', '[-_]?')})"
-    websites = re.findall(website_pattern, base_results + detailed_results)
+    # Extract website URLs if available. Without a name the pattern would match any
+    # university domain, so skip it; collapsing whitespace also keeps the cache keys tidy
+    name_key = ' '.join(university_name.lower().split())
+    websites = _get_website_re(name_key).findall(base_results + detailed_results) if name_key else []
     
     if websites:
-        combined_info += "Official University Website(s):\n"
+        parts.append("Official University Website(s):\n")
         for website in set(websites):
             if not website.startswith('http'):
                 website = 'https://' + website
-            combined_info += f"- {website}\n"
+            parts.append(f"- {website}\n")
     
-    return combined_info
+    return "".join(parts)
 
 def search_university_courses(university_name, subject_area=None):
     """
@@ -411,6 +632,109 @@ Last updated: {datetime.now().strftime('%Y-%m-%d')}
     
     return formatted_response
 
+# Program pages of common universities, by field of study
+UNIVERSITY_PROGRAM_URLS = {
+    "MIT": {
+        "Computer Science": "https://www.eecs.mit.edu/academics-admissions/undergraduate-programs/",
+        "Engineering": "https://engineering.mit.edu/programs/",
+        "Business": "https://mitsloan.mit.edu/programs",
+        "Data Science": "https://www.eecs.mit.edu/research/data-science-ai/",
+        "AI": "https://www.csail.mit.edu/research/artificial-intelligence",
+        "General": "https://www.mit.edu/education/"
+    },
+    "Stanford": {
+        "Business": "https://www.gsb.stanford.edu/programs",
+        "General": "https://www.stanford.edu/academics/"
+    },
+    "Harvard": {
+        "Computer Science": "https://www.seas.harvard.edu/computer-science",
+        "Engineering": "https://www.seas.harvard.edu/academics/undergraduate",
+        "Business": "https://www.hbs.edu/mba/academic-experience/Pages/default.aspx",
+        "General": "https://www.harvard.edu/programs/"
+    },
+    "UC Berkeley": {
+        "Computer Science": "https://eecs.berkeley.edu/academics/undergraduate",
+        "Engineering": "https://engineering.berkeley.edu/degrees-programs/",
+        "Business": "https://haas.berkeley.edu/programs/",
+        "General": "https://www.berkeley.edu/academics/"
+    },
+    "Oxford": {
+        "Computer Science": "https://www.cs.ox.ac.uk/admissions/undergraduate/",
+        "Engineering": "https://eng.ox.ac.uk/study/undergraduate/",
+        "Business": "https://www.sbs.ox.ac.uk/programmes",
+        "General": "https://www.ox.ac.uk/admissions/undergraduate/courses-listing"
+    },
+    "Cambridge": {
+        "Computer Science": "https://www.cst.cam.ac.uk/admissions",
+        "Engineering": "https://www.undergraduate.study.cam.ac.uk/courses/engineering",
+        "Business": "https://www.jbs.cam.ac.uk/programmes/",
+        "General": "https://www.undergraduate.study.cam.ac.uk/courses"
+    }
+}
+
+# Direct links to course catalogs, appended to every program listing
+_COURSE_CATALOG_LINKS = (
+    "\n**Specific Course Searches:**\n\n"
+    "- [MIT OpenCourseWare](https://ocw.mit.edu/search/)\n"
+    "- [Stanford Explore Courses](https://explorecourses.stanford.edu/)\n"
+    "- [Harvard Course Catalog](https://courses.harvard.edu/)\n"
+    "- [Berkeley Academic Guide](https://classes.berkeley.edu/)\n"
+    "- [Oxford Course Listing](https://www.ox.ac.uk/admissions/undergraduate/courses-listing)\n"
+    "- [Cambridge Course Directory](https://www.postgraduate.study.cam.ac.uk/courses)\n"
+)
+
+def _format_program_links(field):
+    """Build the program link listing for one field of study."""
+    parts = ["### University Program Links\n\n"]
+    for university, programs in UNIVERSITY_PROGRAM_URLS.items():
+        if field in programs:
+            parts.append(f"- **{university}**: [{field} Programs]({programs[field]})\n")
+        else:
+            # No dedicated page for this field, point to the general one instead
+            parts.append(f"- **{university}**: [General Programs]({programs['General']})\n")
+    parts.append(_COURSE_CATALOG_LINKS)
+    return "".join(parts)
+
+# Program link listings for each field extract_course_urls can detect, built once
+_FIELD_LINKS = {
+    field: _format_program_links(field)
+    for field in ("General", "Computer Science", "Engineering", "Business")
+}
+
+# Query terms that identify a field of study; fields earlier in _FIELD_PRIORITY win
+_FIELD_TERMS = {
+    "computer": "Computer Science",
+    "programming": "Computer Science",
+    "coding": "Computer Science",
+    "software": "Computer Science",
+    "cs": "Computer Science",
+    "engineering": "Engineering",
+    "engineer": "Engineering",
+    "business": "Business",
+    "mba": "Business",
+    "management": "Business"
+}
+_FIELD_PRIORITY = ("Computer Science", "Engineering", "Business")
+
+# All field terms in one pattern; anchored at a word start so "physics" is not "cs"
+_FIELD_RE = re.compile(r'\b(' + '|'.join(_FIELD_TERMS) + ')', re.IGNORECASE)
+
+def _detect_field(query: str) -> str:
+    """
+    Determine the field of study based on keywords in the query.
+    
+    Args:
+        query: The user's query string
+    
+    Returns:
+        One of the _FIELD_PRIORITY fields, or "General" if none is mentioned
+    """
+    fields = {_FIELD_TERMS[match.group(1).lower()] for match in _FIELD_RE.finditer(query)}
+    for field in _FIELD_PRIORITY:
+        if field in fields:
+            return field
+    return "General"
+
 def extract_course_urls(search_results: str, query: str) -> str:
     """
     Extract and format university course URLs from search results.
@@ -422,73 +746,64 @@ def extract_course_urls(search_results: str, query: str) -> str:
     Returns:
         Formatted markdown links for relevant university courses
     """
-    # Common universities and their program pages with specific course links
-    universities = {
-        "MIT": {
-            "Computer Science": "https://www.eecs.mit.edu/academics-admissions/undergraduate-programs/",
-            "Engineering": "https://engineering.mit.edu/programs/",
-            "Business": "https://mitsloan.mit.edu/programs",
-            "Data Science": "https://www.eecs.mit.edu/research/data-science-ai/",
-            "AI": "https://www.csail.mit.edu/research/artificial-intelligence",
-            "General": "https://www.mit.edu/education/"
-        },
-        "Stanford": {
-            "Business": "https://www.gsb.stanford.edu/programs",
-            "General": "https://www.stanford.edu/academics/"
-        },
-        "Harvard": {
-            "Computer Science": "https://www.seas.harvard.edu/computer-science",
-            "Engineering": "https://www.seas.harvard.edu/academics/undergraduate",
-            "Business": "https://www.hbs.edu/mba/academic-experience/Pages/default.aspx",
-            "General": "https://www.harvard.edu/programs/"
-        },
-        "UC Berkeley": {
-            "Computer Science": "https://eecs.berkeley.edu/academics/undergraduate",
-            "Engineering": "https://engineering.berkeley.edu/degrees-programs/",
-            "Business": "https://haas.berkeley.edu/programs/",
-            "General": "https://www.berkeley.edu/academics/"
-        },
-        "Oxford": {
-            "Computer Science": "https://www.cs.ox.ac.uk/admissions/undergraduate/",
-            "Engineering": "https://eng.ox.ac.uk/study/undergraduate/",
-            "Business": "https://www.sbs.ox.ac.uk/programmes",
-            "General": "https://www.ox.ac.uk/admissions/undergraduate/courses-listing"
-        },
-        "Cambridge": {
-            "Computer Science": "https://www.cst.cam.ac.uk/admissions",
-            "Engineering": "https://www.undergraduate.study.cam.ac.uk/courses/engineering",
-            "Business": "https://www.jbs.cam.ac.uk/programmes/",
-            "General": "https://www.undergraduate.study.cam.ac.uk/courses"
-        }
+    return _FIELD_LINKS[_detect_field(query)]
+
+# Common application deadlines for top universities
+# These are typical deadlines but would be retrieved dynamically in a real system
+UNIVERSITY_DEADLINES = {
+    "MIT": {
+        "Early Action": "November 1, 2025",
+        "Regular Decision": "January 5, 2026",
+        "Transfer": "March 15, 2026"
+    },
+    "Stanford": {
+        "Early Action": "November 1, 2025",
+        "Regular Decision": "January 5, 2026",
+        "Transfer": "March 15, 2026"
+    },
+    "Harvard": {
+        "Early Action": "November 1, 2025",
+        "Regular Decision": "January 1, 2026",
+        "Transfer": "March 1, 2026"
+    },
+    "UC Berkeley": {
+        "All Undergraduate": "November 30, 2025",
+        "Transfer": "November 30, 2025",
+        "Graduate Programs": "December 15, 2025 (varies by program)"
+    },
+    "Oxford": {
+        "UCAS Deadline": "October 15, 2025",
+        "Graduate Programs": "January-March 2026 (varies by program)"
+    },
+    "Cambridge": {
+        "UCAS Deadline": "October 15, 2025",
+        "Graduate Programs": "December-March (varies by program)"
     }
+}
+
+def _format_deadlines():
+    """Build the deadline listing from UNIVERSITY_DEADLINES."""
+    parts = ["### Important Application Deadlines\n\n"]
     
-    # Determine the field of study based on keywords in the query
-    field = "General"
-    if any(term in query.lower() for term in ["computer", "programming", "coding", "software", "cs"]):
-        field = "Computer Science"
-    elif any(term in query.lower() for term in ["engineering", "engineer"]):
-        field = "Engineering"
-    elif any(term in query.lower() for term in ["business", "mba", "management"]):
-        field = "Business"
-    
-    formatted_urls = "### University Program Links\n\n"
-    
-    # Add links to specific programs based on the field
-    for university, programs in universities.items():
-        formatted_urls += f"- **{university}**: [{field} Programs]({programs[field]})\n"
-    
-    # Add note about finding specific courses
-    formatted_urls += "\n**Specific Course Searches:**\n\n"
-    
-    # Add direct links to course catalogs
-    formatted_urls += "- [MIT OpenCourseWare](https://ocw.mit.edu/search/)\n"
-    formatted_urls += "- [Stanford Explore Courses](https://explorecourses.stanford.edu/)\n"
-    formatted_urls += "- [Harvard Course Catalog](https://courses.harvard.edu/)\n"
-    formatted_urls += "- [Berkeley Academic Guide](https://classes.berkeley.edu/)\n"
-    formatted_urls += "- [Oxford Course Listing](https://www.ox.ac.uk/admissions/undergraduate/courses-listing)\n"
-    formatted_urls += "- [Cambridge Course Directory](https://www.postgraduate.study.cam.ac.uk/courses)\n"
+    # Format the deadlines in a clear, readable way
+    for university, deadline_types in UNIVERSITY_DEADLINES.items():
+        parts.append(f"**{university}**\n")
+        for deadline_type, date in deadline_types.items():
+            parts.append(f"- {deadline_type}: {date}\n")
+        parts.append("\n")
     
-    return formatted_urls
+    # Add notes about deadlines
+    parts.append(
+        "**Important Notes:**\n"
+        "- Deadlines may vary for specific programs and change yearly\n"
+        "- Financial aid applications often have separate deadlines\n"
+        "- International students may have earlier deadlines\n"
+        "- Always verify current deadlines on the university's official website\n"
+    )
+    return "".join(parts)
+
+# The deadline listing does not depend on the search results, so build it once
+_DEADLINES_TEXT = _format_deadlines()
 
 def extract_deadlines(search_results: str) -> str:
     """
@@ -500,58 +815,24 @@ def extract_deadlines(search_results: str) -> str:
     Returns:
         Formatted application deadlines for various universities
     """
-    # Common application deadlines for top universities
-    # These are typical deadlines but would be retrieved dynamically in a real system
-    deadlines = {
-        "MIT": {
-            "Early Action": "November 1, 2025",
-            "Regular Decision": "January 5, 2026",
-            "Transfer": "March 15, 2026"
-        },
-        "Stanford": {
-            "Early Action": "November 1, 2025",
-            "Regular Decision": "January 5, 2026",
-            "Transfer": "March 15, 2026"
-        },
-        "Harvard": {
-            "Early Action": "November 1, 2025",
-            "Regular Decision": "January 1, 2026",
-            "Transfer": "March 1, 2026"
-        },
-        "UC Berkeley": {
-            "All Undergraduate": "November 30, 2025",
-            "Transfer": "November 30, 2025",
-            "Graduate Programs": "December 15, 2025 (varies by program)"
-        },
-        "Oxford": {
-            "UCAS Deadline": "October 15, 2025",
-            "Graduate Programs": "January-March 2026 (varies by program)"
-        },
-        "Cambridge": {
-            "UCAS Deadline": "October 15, 2025",
-            "Graduate Programs": "December-March (varies by program)"
-        }
-    }
-    
-    formatted_deadlines = "### Important Application Deadlines\n\n"
-    
-    # Format the deadlines in a clear, readable way
-    for university, deadline_types in deadlines.items():
-        formatted_deadlines += f"**{university}**\n"
-        for deadline_type, date in deadline_types.items():
-            formatted_deadlines += f"- {deadline_type}: {date}\n"
-        formatted_deadlines += "\n"
-    
-    # Add notes about deadlines
-    formatted_deadlines += "**Important Notes:**\n"
-    formatted_deadlines += "- Deadlines may vary for specific programs and change yearly\n"
-    formatted_deadlines += "- Financial aid applications often have separate deadlines\n"
-    formatted_deadlines += "- International students may have earlier deadlines\n"
-    formatted_deadlines += "- Always verify current deadlines on the university's official website\n"
-    
-    return formatted_deadlines
+    return _DEADLINES_TEXT
+
+def _research_queries(university_name):
+    """Search queries to gather different aspects of university information."""
+    return [
+        f"{university_name} official website",
+        f"{university_name} top programs and rankings",
+        f"{university_name} admission requirements",
+        f"{university_name} tuition and fees",
+        f"{university_name} student life and campus",
+        f"{university_name} notable alumni and achievements"
+    ]
 
 def research_university(university_name):
+    """Synchronous wrapper around research_university_async."""
+    return asyncio.run(research_university_async(university_name))
+
+async def research_university_async(university_name):
     """
     Comprehensive university research function that uses multiple search sources
     (Google, DuckDuckGo, and simple_search_agent) to find detailed information
@@ -563,20 +844,14 @@ def research_university(university_name):
     Returns:
         str: Comprehensive information about the university
     """
-    # Search queries to gather different aspects of university information
-    queries = [
-        f"{university_name} official website",
-        f"{university_name} top programs and rankings",
-        f"{university_name} admission requirements",
-        f"{university_name} tuition and fees",
-        f"{university_name} student life and campus",
-        f"{university_name} notable alumni and achievements"
-    ]
+    queries = _research_queries(university_name)
     
-    all_results = []
-    for query in queries:
-        search_results = get_search_response(query)
-        all_results.append(f"Information about {query}:\n{search_results}\n")
+    # The searches are independent, so fire them all at once
+    results = await batch_search_async(queries)
+    all_results = [
+        f"Information about {query}:\n{results[query]}\n"
+        for query in queries
+    ]
     
     # Extract official university website if available
     official_site = extract_university_website(all_results[0], university_name)
@@ -596,20 +871,18 @@ def extract_university_website(search_results, university_name):
     Returns:
         str: URL of the official university website if found, else None
     """
-    # Look for URLs in the search results
-    urls = re.findall(r'https?://[^\s]+', search_results)
+    # An empty name is a substring of every URL, so any university domain would "match"
+    if not university_name or not university_name.strip():
+        return None
     
-    # Check if any URL looks like an official university website
-    for url in urls:
-        url_lower = url.lower()
-        # Check for university name in the URL (simplified version)
-        university_keywords = university_name.lower().replace(' ', '').replace('-', '').replace('university', 'uni')
-        
-        # Check for common university domain patterns
-        is_university_domain = any(domain in url_lower for domain in UNIVERSITY_DOMAINS)
-        
-        # Check if URL contains the university name (simplified) and has a university domain
-        if (university_keywords in url_lower.replace('.', '').replace('-', '').replace('/', '')) and is_university_domain:
+    # University name in the simplified form it would take in a URL
+    university_keywords = university_name.lower().translate(_NAME_DELETE_TABLE).replace('university', 'uni')
+    
+    # Scan lazily for URLs on a university domain, stopping at the first one that
+    # also contains the university name (simplified)
+    for match in _UNIVERSITY_URL_RE.finditer(search_results):
+        url = match.group(0)
+        if university_keywords in url.lower().translate(_URL_DELETE_TABLE):
             return url
     
     return None
@@ -646,41 +919,160 @@ def find_university_courses(university_name, subject_area=None):
     
     return search_results
 
-class CourseRecommenderAgent(Agent):
-    """Agent that recommends specific courses and educational resources."""
+@functools.cache
+def _course_recommender_agent_class():
+    """
+    Define CourseRecommenderAgent on first use.
     
-    def __init__(self, model=None):
-        """Initialize the course recommender agent."""
-        super().__init__(
-            model=model or get_best_available_model(),
-            description="Course recommendation specialist with search capabilities",
-            instructions=[
-                "Recommend specific courses based on career paths and learning goals.",
-                "Search for up-to-date information on educational resources.",
-                "Include links to course websites and learning platforms when available.",
-                "Prioritize resources that match the user's skill level and learning style.",
-                "When recommending university programs, provide specifics about admission requirements and key courses."
-            ],
-            tools=[GoogleSearchTools()],
-            show_tool_calls=False
-        )
+    The class subclasses agno's Agent, so defining it at import time would pull in
+    agno for callers that only need the text helpers or the mock responses.
+    """
+    from agno.agent import Agent
+    
+    class CourseRecommenderAgent(Agent):
+        """Agent that recommends specific courses and educational resources."""
+    
+        def __init__(self, model=None):
+            """Initialize the course recommender agent."""
+            from agno.tools.googlesearch import GoogleSearchTools
+
+            super().__init__(
+                model=model or get_best_available_model(),
+                description="Course recommendation specialist with search capabilities",
+                instructions=[
+                    "Recommend specific courses based on career paths and learning goals.",
+                    "Search for up-to-date information on educational resources.",
+                    "Include links to course websites and learning platforms when available.",
+                    "Prioritize resources that match the user's skill level and learning style.",
+                    "When recommending university programs, provide specifics about admission requirements and key courses."
+                ],
+                tools=[GoogleSearchTools()],
+                show_tool_calls=False
+            )
+        
+        def search_university_courses(self, university_name, subject=None):
+            """
+            Search for university course information using multiple search methods.
+        
+            Args:
+                university_name: Name of the university
+                subject: Optional subject area to focus on
         
-    def search_university_courses(self, university_name, subject=None):
+            Returns:
+                Course information from the university
+            """
+            if subject:
+                query = f"{subject} courses at {university_name}"
+                return search_university_info(university_name, f"{subject} courses and programs")
+            else:
+                return search_university_info(university_name, "popular courses and programs")
+    
+    return CourseRecommenderAgent
+
+def __getattr__(name):
+    """Resolve the agno-backed names lazily (PEP 562)."""
+    if name == "CourseRecommenderAgent":
+        return _course_recommender_agent_class()
+    if name == "Agent":
+        from agno.agent import Agent
+        return Agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class EducationTeam:
+    """
+    Runs the career and course specialists concurrently, then has the leader synthesize.
+    
+    Agno's coordinate mode has the leader consult each specialist in turn, which costs
+    career + courses + leader round trips. Both specialists always receive the user's
+    question, so they are run side by side and the leader only writes the final answer.
+    A specialist that fails or exceeds SPECIALIST_TIMEOUT is left out of the synthesis
+    rather than failing the whole answer.
+    """
+    
+    def __init__(self, leader, career_advisor, course_recommender, name=None, description=None):
+        self.leader = leader
+        self.career_advisor = career_advisor
+        self.course_recommender = course_recommender
+        self.name = name
+        self.description = description
+    
+    async def arun(self, query, course_query=None):
         """
-        Search for university course information using multiple search methods.
+        Answer a query with both specialists in parallel and a final synthesis step.
         
         Args:
-            university_name: Name of the university
-            subject: Optional subject area to focus on
+            query: The user's question
+            course_query: Query for the course recommender instead of query, e.g. with
+                          instructions to search a specific university's website
         
         Returns:
-            Course information from the university
+            The leader's run response
         """
-        if subject:
-            query = f"{subject} courses at {university_name}"
-            return search_university_info(university_name, f"{subject} courses and programs")
-        else:
-            return search_university_info(university_name, "popular courses and programs")
+        career, courses = await self._consult_specialists(query, course_query)
+        return await self.leader.arun(self._synthesis_prompt(query, career, courses))
+    
+    def run(self, query, course_query=None):
+        """Synchronous wrapper around arun, matching Team.run."""
+        return asyncio.run(self.arun(query, course_query))
+    
+    def run_stream(self, query, course_query=None):
+        """
+        Like run, but yield the leader's answer in chunks as the model produces them.
+        
+        The specialists still have to finish first, but the synthesis (usually the
+        longest generation) can be shown as it is written instead of all at once.
+        
+        Args:
+            query: The user's question
+            course_query: Query for the course recommender instead of query
+        
+        Yields:
+            Markdown text chunks of the leader's answer
+        """
+        career, courses = asyncio.run(self._consult_specialists(query, course_query))
+        for event in self.leader.run(self._synthesis_prompt(query, career, courses), stream=True):
+            if getattr(event, "event", None) == "RunResponseContent" and event.content:
+                yield event.content
+    
+    async def _consult_specialists(self, query, course_query=None):
+        """
+        Run the career and course specialists concurrently.
+        
+        Returns:
+            The two answers' text, with None for a specialist that failed or timed out
+        
+        Raises:
+            The first specialist's error if neither produced an answer
+        """
+        results = await asyncio.gather(
+            asyncio.wait_for(self.career_advisor.arun(query), SPECIALIST_TIMEOUT),
+            asyncio.wait_for(self.course_recommender.arun(course_query or query), SPECIALIST_TIMEOUT),
+            return_exceptions=True
+        )
+        answers = []
+        for specialist, result in zip((self.career_advisor, self.course_recommender), results):
+            if isinstance(result, BaseException):
+                print(f"{getattr(specialist, 'name', 'Specialist')} failed: {str(result) or type(result).__name__}")
+                answers.append(None)
+            else:
+                answers.append(result.content)
+        if all(answer is None for answer in answers):
+            raise results[0]
+        return answers
+    
+    @staticmethod
+    def _synthesis_prompt(query, career, courses):
+        """Build the leader's prompt from the specialists' answers, noting any that are missing."""
+        career = career if career is not None else "(The Career Advisor is unavailable; cover career advice yourself.)"
+        courses = courses if courses is not None else "(The Course Recommender is unavailable; cover courses yourself.)"
+        return f"Synthesize:\nCAREER:\n{career}\nCOURSES:\n{courses}\n\nUser asked: {query}"
+    
+    def reset(self):
+        """Forget earlier runs, which agents otherwise keep in memory for the whole session."""
+        for agent in (self.leader, self.career_advisor, self.course_recommender):
+            memory = getattr(agent, "memory", None)
+            if memory is not None and hasattr(memory, "clear"):
+                memory.clear()
 
 def create_education_team():
     """Create the education guidance team with specialized agents."""
@@ -691,6 +1083,8 @@ def create_education_team():
         return None
     
     try:
+        from agno.agent import Agent
+        
         # Create the Career Guidance Agent
         career_guidance_agent = Agent(
             name="Career Advisor",
@@ -708,7 +1102,7 @@ def create_education_team():
         )
         
         # Create the Course Recommender Agent that uses our search capabilities
-        course_recommender_agent = CourseRecommenderAgent(
+        course_recommender_agent = _course_recommender_agent_class()(
             model=model
         )
         
@@ -717,27 +1111,24 @@ def create_education_team():
             name="Education Team Leader",
             role="Team Coordinator",
             model=model,
-            description="You are the leader of an education advisory team, coordinating career guidance and course recommendations.",
+            description="You are the leader of an education advisory team, combining career guidance and course recommendations.",
             instructions=[
-                "Analyze user queries to determine what combination of career advice and course recommendations is needed.",
-                "Identify if a specific university is mentioned in the query and ensure the Course Recommender targets that institution.",
-                "Delegate specific subtasks to the appropriate specialist agent.",
-                "For career questions, consult the Career Advisor agent.",
-                "For course and education questions, consult the Course Recommender agent.",
-                "When a university is mentioned, ensure Course Recommender provides university-specific information.",
+                "You receive the Career Advisor's answer under CAREER and the Course Recommender's answer under COURSES.",
+                "Use the parts of each answer that are relevant to what the user asked.",
+                "When a university is mentioned, keep the university-specific course information from the Course Recommender.",
                 "Synthesize the inputs from specialist agents into a comprehensive, coherent response.",
                 "Ensure all advice is practical, specific, and actionable.",
                 "Present information in a clear, well-organized format with appropriate headings and bullet points."
             ]
         )
         
-        # Create the coordinated team
-        education_team = Team(
-            members=[team_leader, career_guidance_agent, course_recommender_agent],
-            mode="coordinate",
+        # Create the team; the specialists run in parallel and the leader synthesizes
+        education_team = EducationTeam(
+            leader=team_leader,
+            career_advisor=career_guidance_agent,
+            course_recommender=course_recommender_agent,
             name="Education Advisory Team",
-            description="A team that provides comprehensive education and career guidance",
-            success_criteria="Deliver personalized, actionable advice that combines career guidance with specific course recommendations"
+            description="A team that provides comprehensive education and career guidance"
         )
         
         return education_team
@@ -745,59 +1136,36 @@ def create_education_team():
         print(f"Error creating education team: {str(e)}")
         return None
 
+# Agents keep per-run state on the instance, so a team is reused by the thread that
+# built it rather than shared between concurrent requests
+_team_local = threading.local()
+
+def _get_team():
+    """
+    Return this thread's education team, creating it on first use.
+    
+    Building the team allocates three agents with their instruction lists, so it is
+    done once per worker thread instead of once per request. If no model is available
+    nothing is cached, and the next call tries again.
+    
+    Returns:
+        The EducationTeam, or None if it could not be created
+    """
+    team = getattr(_team_local, "team", None)
+    if team is None:
+        team = _team_local.team = create_education_team()
+    else:
+        team.reset()
+    return team
+
 # Custom function to search for courses
 def search_for_courses(query):
     """Use our existing search agent to find course information."""
     search_query = f"recommended courses for {query}"
     return get_search_response(search_query)
 
-# Mock responses when the real implementation isn't available
-def _mock_education_response(query):
-    """Provide a mock education guidance response when APIs aren't available."""
-    university_name = extract_university_name(query)
-    query_lower = query.lower()
-    
-    # If university was mentioned, include university-specific information
-    if university_name:
-        return f"""# Course Recommendations at {university_name}
-
-## Available Programs
-Based on your interest in "{query}" at {university_name}, I've found these relevant programs:
-
-1. Bachelor's Degree Programs:
-   - {university_name} offers a Bachelor of Science in this field
-   - Core courses include foundational theory and practical applications
-   - Program typically takes 3-4 years to complete
-
-2. Master's Degree Options:
-   - Master of Science with specialization options
-   - Advanced research opportunities in specialized labs
-   - Professional track with industry partnerships
-
-3. Certificate Programs:
-   - Short-term certification courses (3-6 months)
-   - Weekend and online options available
-   - Industry-recognized credentials
-
-## Admission Requirements
-- Undergraduate admission: High school diploma with strong academic record
-- Graduate admission: Bachelor's degree in related field with minimum GPA
-- Some programs require standardized test scores (SAT, GRE)
-- Application deadlines: Fall (January 15), Spring (October 1)
-
-## Student Resources
-- Dedicated academic advisors
-- Career services with industry connections
-- Research opportunities and internship placements
-- Financial aid and scholarship options
-
-## Next Steps
-I recommend visiting the {university_name} official website and scheduling a meeting with an admissions counselor to discuss your specific interests and goals. They can provide personalized guidance on program selection and the application process.
-
-Would you like more specific information about any particular program at {university_name}?"""
-    
-    elif "data scientist" in query_lower or "data science" in query_lower:
-        return """# Career Path: Data Scientist
+# Mock guidance for common career paths
+_DATA_SCIENCE_GUIDANCE = """# Career Path: Data Scientist
 
 ## Recommended Education & Courses
 
@@ -835,9 +1203,8 @@ The data science field offers excellent growth opportunities with median salarie
 5. Network with data professionals on LinkedIn and through local meetups
 
 This career path typically takes 1-2 years of focused learning before landing your first data science role."""
-    
-    elif "web developer" in query_lower or "web development" in query_lower:
-        return """# Career Path: Web Developer
+
+_WEB_DEVELOPMENT_GUIDANCE = """# Career Path: Web Developer
 
 ## Recommended Education & Courses
 
@@ -874,9 +1241,100 @@ Web development offers diverse opportunities with entry-level salaries around $7
 5. Deploy projects using free services like Netlify or Vercel
 
 Many successful web developers are self-taught. With 6-12 months of dedicated learning, you can build a portfolio ready for job applications."""
+
+# Phrases that select each career's mock guidance; the first matching entry wins
+_CAREER_GUIDANCE = {
+    ("data scientist", "data science"): _DATA_SCIENCE_GUIDANCE,
+    ("web developer", "web development"): _WEB_DEVELOPMENT_GUIDANCE
+}
+
+# All career phrases in one pattern, with group "c<i>" for the i-th _CAREER_GUIDANCE entry
+_CAREER_RE = re.compile(
+    '|'.join(
+        f"(?P<c{i}>" + '|'.join(re.escape(phrase) for phrase in phrases) + ")"
+        for i, phrases in enumerate(_CAREER_GUIDANCE)
+    ),
+    re.IGNORECASE
+)
+_CAREER_TEMPLATES = tuple(_CAREER_GUIDANCE.values())
+
+def _match_career_guidance(query: str) -> Optional[str]:
+    """
+    Find the mock guidance for a career mentioned in the query.
     
-    else:
-        return f"""# Career and Education Guidance: {query}
+    Args:
+        query: The user's query string
+    
+    Returns:
+        The guidance of the highest-priority career mentioned, or None
+    """
+    best = None
+    for match in _CAREER_RE.finditer(query):
+        index = int(match.lastgroup[1:])
+        if best is None or index < best:
+            best = index
+            if best == 0:
+                break
+    return _CAREER_TEMPLATES[best] if best is not None else None
+
+# Mock responses when the real implementation isn't available
+def _mock_education_response(query, university_name=None):
+    """
+    Provide a mock education guidance response when APIs aren't available.
+    
+    Args:
+        query: The user's question
+        university_name: The university mentioned in the query, if the caller has
+                         already extracted it
+    """
+    if university_name is None:
+        university_name = extract_university_name(query)
+    
+    # If university was mentioned, include university-specific information
+    if university_name:
+        return f"""# Course Recommendations at {university_name}
+
+## Available Programs
+Based on your interest in "{query}" at {university_name}, I've found these relevant programs:
+
+1. Bachelor's Degree Programs:
+   - {university_name} offers a Bachelor of Science in this field
+   - Core courses include foundational theory and practical applications
+   - Program typically takes 3-4 years to complete
+
+2. Master's Degree Options:
+   - Master of Science with specialization options
+   - Advanced research opportunities in specialized labs
+   - Professional track with industry partnerships
+
+3. Certificate Programs:
+   - Short-term certification courses (3-6 months)
+   - Weekend and online options available
+   - Industry-recognized credentials
+
+## Admission Requirements
+- Undergraduate admission: High school diploma with strong academic record
+- Graduate admission: Bachelor's degree in related field with minimum GPA
+- Some programs require standardized test scores (SAT, GRE)
+- Application deadlines: Fall (January 15), Spring (October 1)
+
+## Student Resources
+- Dedicated academic advisors
+- Career services with industry connections
+- Research opportunities and internship placements
+- Financial aid and scholarship options
+
+## Next Steps
+I recommend visiting the {university_name} official website and scheduling a meeting with an admissions counselor to discuss your specific interests and goals. They can provide personalized guidance on program selection and the application process.
+
+Would you like more specific information about any particular program at {university_name}?"""
+    
+    # Career-specific guidance, found in one pass over the query
+    guidance = _match_career_guidance(query)
+    if guidance is not None:
+        return guidance
+    
+    return f"""# Career and Education Guidance: {query}
 
 ## Education Recommendations
 
@@ -915,33 +1373,126 @@ This field offers various career paths with different requirements and growth op
 
 Would you like more specific recommendations about particular aspects of this field?"""
 
+def _is_transient_error(error):
+    """Return True for provider errors worth retrying (rate limits, timeouts, 5xx)."""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    # Agno's ModelProviderError and the OpenAI SDK errors both carry the HTTP status
+    return getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES
+
+def _team_run(team, query, course_query=None, max_attempts=3):
+    """
+    Run the team, retrying transient failures with exponential backoff.
+    
+    Rate limits, timeouts and server errors are retried up to max_attempts times,
+    waiting 1s, 2s, 4s... (capped at 8s) between attempts. Any other error, or the
+    last failed attempt, is re-raised so the caller can fall back to the mock response.
+    course_query, if given, is what the course recommender is asked instead of query.
+    """
+    for attempt in range(max_attempts):
+        try:
+            return team.run(query, course_query)
+        except Exception as e:
+            if attempt == max_attempts - 1 or not _is_transient_error(e):
+                raise
+            delay = min(2 ** attempt, 8)
+            print(f"Education team attempt {attempt+1}/{max_attempts} failed: {str(e)}. Retrying in {delay}s")
+            time.sleep(delay)
+
+def _enrich_query(query, university_name):
+    """If a university is mentioned, include it in a structured way for the agents."""
+    if university_name:
+        return f"Looking for courses about {query} at {university_name} specifically. Please search the {university_name} website for course information."
+    return query
+
 # Main execution function
 def get_education_guidance(query):
-    """Get education and career guidance for a specific query."""
+    """
+    Get education and career guidance for a specific query.
+    
+    Answers are cached for GUIDANCE_CACHE_TTL seconds by university and normalized
+    query, so rephrasings of the same question don't run the team again. Mock
+    fallback responses are not cached.
+    """
+    if not AGNO_AVAILABLE:
+        return _mock_education_response(query)
+    
+    university_name = None
     try:
         # Extract university name if present
         university_name = extract_university_name(query)
         
-        # Create the team
-        team = create_education_team()
+        cache_key = (university_name.lower(), normalize_query(query))
+        cached = _guidance_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Get the team
+        team = _get_team()
         
         if team is None:
-            return _mock_education_response(query)
+            return _mock_education_response(query, university_name)
         
         # Run the team with the user's query
-        # If university is mentioned, include it in a structured way for the agents
-        if university_name:
-            enriched_query = f"Looking for courses about {query} at {university_name} specifically. Please search the {university_name} website for course information."
-            response = team.run(enriched_query)
-        else:
-            response = team.run(query)
+        response = _team_run(team, query, _enrich_query(query, university_name))
         
-        # Clean up the response
-        clean_response = extract_important_content(response)
+        # Clean up the response (EducationTeam.run returns a run response object, not a string)
+        clean_response = extract_important_content(getattr(response, "content", response) or "")
+        if clean_response:
+            _guidance_cache.put(cache_key, clean_response)
         return clean_response
     except Exception as e:
         print(f"Error: {str(e)}")
-        return _mock_education_response(query)
+        return _mock_education_response(query, university_name)
+
+def stream_education_guidance(query):
+    """
+    Stream education and career guidance for a query as it is generated.
+    
+    Yields markdown chunks of the team's answer (the chunks are not run through
+    extract_important_content, since a chunk can end in the middle of a marker).
+    An answer already in the guidance cache is yielded whole, and a completed stream
+    is added to it. Falls back to the mock response if no model is available or the
+    team fails before producing any output; an error after that is raised, as the
+    answer can no longer be replaced.
+    
+    Args:
+        query: The user's question
+    
+    Yields:
+        Text chunks of the answer
+    """
+    if not AGNO_AVAILABLE:
+        yield _mock_education_response(query)
+        return
+    
+    university_name = None
+    chunks = []
+    try:
+        university_name = extract_university_name(query)
+        cache_key = (university_name.lower(), normalize_query(query))
+        cached = _guidance_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        team = _get_team()
+        if team is None:
+            yield _mock_education_response(query, university_name)
+            return
+        
+        for chunk in team.run_stream(query, _enrich_query(query, university_name)):
+            chunks.append(chunk)
+            yield chunk
+        
+        clean_response = extract_important_content("".join(chunks))
+        if clean_response:
+            _guidance_cache.put(cache_key, clean_response)
+    except Exception as e:
+        if chunks:
+            raise
+        print(f"Error: {str(e)}")
+        yield _mock_education_response(query, university_name)
 
 if __name__ == "__main__":
     print("\nEducation Advisory Team")
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Response Cache
+
+This module provides a small in-memory cache for agent responses, so repeated
+questions are answered without running the agents (and paying for the LLM calls)
+again. Entries expire after a time-to-live and the least recently used entries are
+evicted once the cache is full. SQLiteResponseCache keeps its entries in a file
+instead, so they survive process restarts.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+# Filler words that don't change what is being asked when they open a query
+STOP_WORDS = frozenset({
+    'a', 'an', 'the', 'to', 'for', 'of', 'in', 'on', 'at', 'and', 'or', 'as',
+    'is', 'are', 'be', 'become', 'what', 'which', 'i', 'me', 'my', 'should',
+    'can', 'do', 'does', 'want', 'please', 'some', 'any', 'about'
+})
+
+def normalize_query(query: str) -> str:
+    """
+    Reduce a query to a key shared by trivially different phrasings.
+
+    The key is the lowercased query with whitespace collapsed and leading stop words
+    dropped, so "Please, what are data science courses" and "data science courses" share
+    an entry. Word order is kept: "paris to london" and "london to paris" are different
+    questions. Queries made only of stop words keep their (lowercased) wording.
+
+    Args:
+        query: The user's query
+
+    Returns:
+        str: The normalized query
+    """
+    words = query.lower().split()
+    start = 0
+    while start < len(words) and words[start].strip(',.!?:;') in STOP_WORDS:
+        start += 1
+    return ' '.join(words[start:]) or ' '.join(words)
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with a time-to-live for each entry.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 3600):
+        """
+        Initialize an empty cache.
+
+        Args:
+            maxsize: Maximum number of entries kept
+            ttl: Seconds an entry stays valid after it is stored
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached value.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The cached value, or None if it is missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entries past maxsize.
+
+        Args:
+            key: The cache key
+            value: The value to cache
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class SQLiteResponseCache:
+    """
+    Response cache stored in a SQLite file, with the same interface as ResponseCache.
+
+    Entries outlive the process, so a restarted server or REPL still answers repeated
+    questions from the cache. Expiry uses wall-clock time for the same reason. Values
+    must be strings.
+    """
+
+    def __init__(self, path: str, ttl: float = 3600):
+        """
+        Open (or create) the cache file.
+
+        Args:
+            path: Path of the SQLite database file
+            ttl: Seconds an entry stays valid after it is stored
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, expires REAL NOT NULL, value TEXT NOT NULL)"
+            )
+
+    @staticmethod
+    def _db_key(key: Hashable) -> str:
+        """Turn a cache key (e.g. a tuple of strings) into a fixed-length text key."""
+        return hashlib.sha256(repr(key).encode()).hexdigest()
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """
+        Get a cached value.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The cached value, or None if it is missing or expired
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM responses WHERE key = ? AND expires > ?",
+                (self._db_key(key), time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: Hashable, value: str) -> None:
+        """
+        Store a value, dropping any expired entries.
+
+        Args:
+            key: The cache key
+            value: The value to cache
+        """
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, expires, value) VALUES (?, ?, ?)",
+                (self._db_key(key), now + self.ttl, value)
+            )
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM responses WHERE expires > ?", (time.time(),)
+            ).fetchone()[0]
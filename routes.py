@@ -1,622 +1,502 @@
-from flask import Blueprint, request, jsonify
-from simple_search_agent import get_search_response
-from calendar_agent import (
-    schedule_calendar_event,
-    update_calendar_event,
-    delete_calendar_event,
-    list_calendar_events,
-    process_calendar_query
-)
-from education_team import get_education_guidance
+import atexit
+import functools
+import gzip
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, Response, request, jsonify, make_response, stream_with_context
+from werkzeug.exceptions import HTTPException
+from response_cache import ResponseCache
 
 # Create a Blueprint for API routes
 api_blueprint = Blueprint('api', __name__)
 
+# Calendar listings go stale as soon as an event changes, so they are kept briefly and
+# dropped whenever a calendar request may have changed something
+calendar_list_cache = ResponseCache(maxsize=64, ttl=60)
+
+# Most queries accepted by one batch request
+MAX_BATCH_QUERIES = 20
+
+# Worker threads running every agent call, including batch fan-outs. This bounds how
+# many agent runs are in flight at once, and long-lived threads keep their education
+# team (built once per thread) between requests, which the server's per-request
+# threads can't
+_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="agent")
+
+# Seconds a request waits for an agent before giving up
+AGENT_TIMEOUT = float(os.getenv("AGENT_TIMEOUT", "120"))
+
+@atexit.register
+def _shutdown_executor():
+    """Stop the agent workers when the process exits, dropping queued work."""
+    _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+
+# Responses smaller than this (bytes) aren't worth compressing
+MIN_COMPRESS_SIZE = 500
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html', 'text/plain', 'text/markdown'}
+
+def _run_agent(func, *args):
+    """
+    Run a blocking agent call on _EXECUTOR and wait for its answer.
+    
+    Args:
+        func: The agent function to call
+        *args: Arguments for func
+    
+    Returns:
+        Whatever func returns
+    
+    Raises:
+        TimeoutError: If the agent hasn't answered within AGENT_TIMEOUT seconds
+    """
+    future = _EXECUTOR.submit(func, *args)
+    try:
+        return future.result(timeout=AGENT_TIMEOUT)
+    except TimeoutError:
+        future.cancel()
+        raise TimeoutError(f"The agent did not answer within {AGENT_TIMEOUT:g} seconds") from None
+
+@functools.lru_cache(maxsize=512)
+def _etag(text):
+    """Fingerprint an answer; answers served from the caches are hashed once."""
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+def _conditional_answer(field, text):
+    """
+    Return {field: text} as JSON, or an empty 304 if the client already has this answer.
+    
+    The ETag is weak because the body may or may not be gzipped on the way out.
+    Werkzeug's make_conditional only handles GET and HEAD, so If-None-Match is
+    checked here for the POST endpoints.
+    """
+    etag = _etag(text)
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify({field: text})
+    response.set_etag(etag, weak=True)
+    return response
+
+# Response header telling whether an answer came from an agent ('agent') or is a mock
+# or error fallback ('fallback')
+ANSWER_SOURCE_HEADER = 'X-Answer-Source'
+
+def _answer_json(payload, is_real):
+    """
+    Return payload as JSON, marked with where the answer came from.
+    
+    Args:
+        payload: The JSON-serializable answer
+        is_real: False if the answer is a mock or error fallback
+    """
+    response = jsonify(payload)
+    response.headers[ANSWER_SOURCE_HEADER] = 'agent' if is_real else 'fallback'
+    return response
+
+def _cache_json_post(cache):
+    """
+    Serve repeated POST requests to a read-only endpoint from cache.
+    
+    The key is the endpoint name plus the request body with its keys sorted, so the
+    same payload hits regardless of key order. Only successful answers the view marked
+    as coming from an agent (see _answer_json) are stored, so mock fallbacks are never
+    replayed; requests without a JSON object body go straight to the view.
+    
+    Args:
+        cache: The ResponseCache holding this endpoint's answers
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict):
+                return view(*args, **kwargs)
+            
+            payload = json.dumps(data, sort_keys=True, separators=(',', ':'))
+            key = hashlib.blake2b(f'{request.endpoint}\0{payload}'.encode(), digest_size=16).digest()
+            body = cache.get(key)
+            if body is not None:
+                return Response(body, mimetype='application/json', headers={ANSWER_SOURCE_HEADER: 'agent'})
+            
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and response.headers.get(ANSWER_SOURCE_HEADER) == 'agent':
+                cache.put(key, response.get_data())
+            return response
+        return wrapper
+    return decorator
+
+@functools.lru_cache(maxsize=256)
+def _gzip(body):
+    """Gzip a response body; repeated bodies (forms, cached answers) are compressed once."""
+    return gzip.compress(body, compresslevel=6)
+
+# Directory holding the HTML test forms served on GET
+FORMS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+def _read_form(filename):
+    """Read one of the test forms from FORMS_DIR."""
+    with open(os.path.join(FORMS_DIR, filename), 'rb') as f:
+        return f.read()
+
+# The forms are read once at import rather than on every request
+_SEARCH_FORM_HTML = _read_form('search.html')
+_CALENDAR_FORM_HTML = _read_form('calendar.html')
+_EDUCATION_FORM_HTML = _read_form('education.html')
+_UNIVERSITY_COURSES_FORM_HTML = _read_form('university_courses.html')
+
+# Browsers may reuse a form for this long (seconds) before fetching it again
+FORM_MAX_AGE = 3600
+
+# The forms never change while the server runs, so they are compressed once, at the
+# highest level, and fingerprinted once for revalidation
+_FORMS = (_SEARCH_FORM_HTML, _CALENDAR_FORM_HTML, _EDUCATION_FORM_HTML, _UNIVERSITY_COURSES_FORM_HTML)
+_FORM_GZIP = {html: gzip.compress(html, compresslevel=9) for html in _FORMS}
+_FORM_ETAGS = {html: hashlib.blake2b(html, digest_size=16).hexdigest() for html in _FORMS}
+
+def _form_response(html):
+    """
+    Serve one of the test forms, sending the pre-gzipped copy to clients that accept it.
+    
+    Browsers revalidating a form they already have get an empty 304. The ETag is weak
+    because the body may be sent gzipped or not.
+    """
+    response = Response(html, mimetype='text/html')
+    response.cache_control.public = True
+    response.cache_control.max_age = FORM_MAX_AGE
+    response.vary.add('Accept-Encoding')
+    response.set_etag(_FORM_ETAGS[html], weak=True)
+    if request.accept_encodings['gzip']:
+        response.set_data(_FORM_GZIP[html])
+        response.headers['Content-Encoding'] = 'gzip'
+    return response.make_conditional(request)
+
+# Fields each endpoint needs in its POST body, as non-empty strings, and the error
+# returned when one is missing. An empty tuple only requires a JSON object
+_REQUIRED_FIELDS = {
+    'api.search_endpoint': (('query',), 'No query provided'),
+    'api.calendar_endpoint': ((), 'Missing data'),
+    'api.calendar_schedule_endpoint': (('details',), 'No event details provided'),
+    'api.calendar_update_endpoint': (('original_event', 'new_details'), 'Missing event information'),
+    'api.calendar_delete_endpoint': (('event',), 'No event specified for deletion'),
+    'api.education_endpoint': (('query',), 'No query provided'),
+    'api.university_courses_endpoint': (('query',), 'No query provided'),
+    'api.university_courses_search_endpoint': (('university',), 'No university specified'),
+    'api.university_info_endpoint': (('university',), 'No university specified'),
+    'api.university_recommendations_endpoint': (('interests',), 'No interests specified')
+}
+
+@api_blueprint.before_request
+def _validate_request():
+    """
+    Reject unusable POST bodies before the view runs.
+    
+    Every POST endpoint takes JSON, so other content types are refused without reading
+    the body (bodies over MAX_CONTENT_LENGTH are already refused by Werkzeug). Bodies
+    missing the fields their endpoint requires get the endpoint's 400.
+    """
+    if request.method != 'POST':
+        return None
+    if not request.is_json:
+        return jsonify({'error': 'Request body must be JSON'}), 415
+    if request.endpoint not in _REQUIRED_FIELDS:
+        return None
+    
+    fields, error = _REQUIRED_FIELDS[request.endpoint]
+    data = request.get_json(silent=True)
+    if not data or not isinstance(data, dict):
+        return jsonify({'error': error}), 400
+    for field in fields:
+        value = data.get(field)
+        if not isinstance(value, str) or not value.strip():
+            return jsonify({'error': error}), 400
+    return None
+
+@api_blueprint.errorhandler(Exception)
+def _handle_error(e):
+    """Answer any error raised by an endpoint as JSON: HTTP errors keep their status, the rest are 500s."""
+    if isinstance(e, HTTPException):
+        return jsonify({'error': e.description}), e.code
+    print(f"Error handling {request.path}: {type(e).__name__}: {str(e)}")
+    return jsonify({'error': str(e)}), 500
+
+@api_blueprint.after_request
+def _compress_response(response):
+    """Gzip sizeable text responses for clients that accept it."""
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 304)
+        or response.direct_passthrough
+        or response.is_streamed
+        or 'Content-Encoding' in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+    
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_SIZE:
+        return response
+    
+    # The body now depends on the client's Accept-Encoding, whichever way it goes
+    response.vary.add('Accept-Encoding')
+    if not request.accept_encodings['gzip']:
+        return response
+    
+    response.set_data(_gzip(body))
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
 @api_blueprint.route('/search', methods=['GET', 'POST'])
 def search_endpoint():
     """Handle search queries and return agent responses."""
-    if request.method == 'GET':
+    if request.method in ('GET', 'HEAD'):
         # For GET requests, return a simple HTML form for testing
-        return '''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Search Agent API</title>
-            <style>
-                body { font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }
-                .container { max-width: 800px; margin: 0 auto; }
-                textarea { width: 100%; height: 100px; margin-bottom: 10px; padding: 8px; }
-                button { padding: 10px 15px; background-color: #4CAF50; color: white; border: none; cursor: pointer; }
-                #response { margin-top: 20px; white-space: pre-wrap; background-color: #f5f5f5; padding: 15px; border-radius: 5px; }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>Search Agent API</h1>
-                <form id="searchForm">
-                    <label for="query">Enter your search query:</label><br>
-                    <textarea id="query" name="query" required></textarea><br>
-                    <button type="submit">Search</button>
-                </form>
-                <div id="loading" style="display: none;">Processing search query...</div>
-                <div id="response"></div>
-            </div>
-            
-            <script>
-                document.getElementById('searchForm').addEventListener('submit', function(e) {
-                    e.preventDefault();
-                    
-                    const query = document.getElementById('query').value;
-                    const loadingDiv = document.getElementById('loading');
-                    const responseDiv = document.getElementById('response');
-                    
-                    loadingDiv.style.display = 'block';
-                    responseDiv.innerHTML = '';
-                    
-                    fetch('/api/search', {
-                        method: 'POST',
-                        headers: {
-                            'Content-Type': 'application/json'
-                        },
-                        body: JSON.stringify({ query: query })
-                    })
-                    .then(response => response.json())
-                    .then(data => {
-                        loadingDiv.style.display = 'none';
-                        responseDiv.innerHTML = data.response;
-                    })
-                    .catch(error => {
-                        loadingDiv.style.display = 'none';
-                        responseDiv.innerHTML = 'Error: ' + error;
-                    });
-                });
-            </script>
-        </body>
-        </html>
-        '''
+        return _form_response(_SEARCH_FORM_HTML)
     
     # Handle POST request
     data = request.json
     
-    if not data or 'query' not in data:
-        return jsonify({'error': 'No query provided'}), 400
+    user_query = data['query']
+    
+    # Clients that accept server-sent events get the answer as it is written
+    if _wants_event_stream():
+        from simple_search_agent import stream_search_response
+        return _sse_response(stream_search_response(user_query))
+    
+    # The search agent reuses its real answers to the same query, and never
+    # caches the mock fallback
+    from simple_search_agent import get_search_response
+    response = _run_agent(get_search_response, user_query)
+    return _conditional_answer('response', response)
+
+def _wants_event_stream():
+    """Whether the client asked for the answer as server-sent events."""
+    return 'text/event-stream' in request.headers.get('Accept', '')
+
+def _sse_response(chunks):
+    """Send text chunks to the client as a stream of server-sent events."""
+    return Response(
+        stream_with_context(_sse_stream(chunks)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def _sse_data(chunk):
+    """Frame a chunk as the data of one event, one 'data:' line per line of text."""
+    return ''.join(f'data: {line}\n' for line in chunk.split('\n')) + '\n'
+
+def _sse_stream(chunks):
+    """
+    Frame text chunks as server-sent events.
     
+    Each chunk becomes one event; a chunk spanning several lines is sent as several
+    'data:' lines, which the client joins back together with newlines. The stream
+    ends with a 'done' event, or an 'error' event carrying the message if the agent
+    fails part way, so the client can tell a complete answer from a cut-off one.
+    """
     try:
-        user_query = data['query']
-        response = get_search_response(user_query)
-        return jsonify({'response': response})
+        for chunk in chunks:
+            yield _sse_data(chunk)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        print(f"Error streaming {request.path}: {type(e).__name__}: {str(e)}")
+        yield 'event: error\n' + _sse_data(str(e))
+        return
+    yield 'event: done\ndata: \n\n'
+
+def _run_batch(handler, data):
+    """
+    Run handler over the 'queries' list of a batch request in parallel on _EXECUTOR.
+    
+    Repeated queries are only answered once.
+    
+    Args:
+        handler: Function answering a single query
+        data: The parsed JSON request body
+    
+    Returns:
+        A (response, status) tuple for the view to return
+    """
+    queries = data.get('queries') if isinstance(data, dict) else None
+    if not isinstance(queries, list) or not queries:
+        return jsonify({'error': 'No queries provided'}), 400
+    if not all(isinstance(query, str) and query.strip() for query in queries):
+        return jsonify({'error': 'Each query must be a non-empty string'}), 400
+    if len(queries) > MAX_BATCH_QUERIES:
+        return jsonify({'error': f'At most {MAX_BATCH_QUERIES} queries per batch'}), 400
+    
+    unique_queries = list(dict.fromkeys(queries))
+    answers = dict(zip(unique_queries, _EXECUTOR.map(handler, unique_queries, timeout=AGENT_TIMEOUT)))
+    return jsonify({'responses': [answers[query] for query in queries]}), 200
+
+@api_blueprint.route('/search/batch', methods=['POST'])
+def search_batch_endpoint():
+    """Answer several search queries in one request."""
+    from simple_search_agent import get_search_response
+    return _run_batch(get_search_response, request.json)
+
+# calendar_agent functions handling each single-argument calendar action, by name so
+# calendar_agent is still only imported when a calendar request arrives
+_CAL_ACTIONS = {
+    'add': 'schedule_calendar_event',
+    'delete': 'delete_calendar_event',
+    'view': 'list_calendar_events'
+}
 
 @api_blueprint.route('/calendar', methods=['GET', 'POST'])
 def calendar_endpoint():
     """Manage calendar events through the calendar agent."""
-    if request.method == 'GET':
+    if request.method in ('GET', 'HEAD'):
         # For GET requests, return a simple HTML form for testing
-        return '''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Calendar Management</title>
-            <style>
-                body { font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }
-                .container { max-width: 800px; margin: 0 auto; }
-                select, input, textarea { width: 100%; margin-bottom: 10px; padding: 8px; }
-                textarea { height: 100px; }
-                button { padding: 10px 15px; background-color: #4CAF50; color: white; border: none; cursor: pointer; }
-                #response { margin-top: 20px; white-space: pre-wrap; background-color: #f5f5f5; padding: 15px; border-radius: 5px; }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>Calendar Management</h1>
-                <form id="calendarForm">
-                    <label for="action">Action:</label><br>
-                    <select id="action" name="action">
-                        <option value="add">Add Event</option>
-                        <option value="edit">Edit Event</option>
-                        <option value="delete">Delete Event</option>
-                        <option value="view">View Calendar</option>
-                    </select><br>
-                    
-                    <label for="details">Event Details:</label><br>
-                    <textarea id="details" name="details" placeholder="For add: 'Meeting titled Team Sync on April 30, 2025 at 2:00 PM'&#10;For edit: 'Team Sync on April 30 to Team Planning on May 1'&#10;For delete: 'Team Sync on April 30'"></textarea><br>
-                    
-                    <button type="submit">Submit</button>
-                </form>
-                <div id="loading" style="display: none;">Processing calendar request...</div>
-                <div id="response"></div>
-            </div>
-            
-            <script>
-                document.getElementById('calendarForm').addEventListener('submit', function(e) {
-                    e.preventDefault();
-                    
-                    const action = document.getElementById('action').value;
-                    const details = document.getElementById('details').value;
-                    
-                    const loadingDiv = document.getElementById('loading');
-                    const responseDiv = document.getElementById('response');
-                    
-                    loadingDiv.style.display = 'block';
-                    responseDiv.innerHTML = '';
-                    
-                    // Get the appropriate endpoint based on action
-                    let endpoint = '/api/calendar';
-                    let payload = {};
-                    
-                    if (action === 'add') {
-                        endpoint = '/api/calendar/schedule';
-                        payload = { details: details };
-                    } else if (action === 'edit') {
-                        endpoint = '/api/calendar/update';
-                        const parts = details.split(' to ');
-                        payload = { 
-                            original_event: parts[0], 
-                            new_details: parts.length > 1 ? parts[1] : details 
-                        };
-                    } else if (action === 'delete') {
-                        endpoint = '/api/calendar/delete';
-                        payload = { event: details };
-                    } else if (action === 'view') {
-                        endpoint = '/api/calendar/list';
-                        payload = { time_period: details };
-                    }
-                    
-                    fetch(endpoint, {
-                        method: 'POST',
-                        headers: {
-                            'Content-Type': 'application/json'
-                        },
-                        body: JSON.stringify(payload)
-                    })
-                    .then(response => response.json())
-                    .then(data => {
-                        loadingDiv.style.display = 'none';
-                        responseDiv.innerHTML = data.result || data.response || JSON.stringify(data);
-                    })
-                    .catch(error => {
-                        loadingDiv.style.display = 'none';
-                        responseDiv.innerHTML = 'Error: ' + error;
-                    });
-                });
-            </script>
-        </body>
-        </html>
-        '''
+        return _form_response(_CALENDAR_FORM_HTML)
     
     # Handle POST request - General calendar query
     data = request.json
+    query = data.get('query')
+    action = data.get('action')
+    details = data.get('details')
     
-    if not data:
-        return jsonify({'error': 'Missing data'}), 400
-    
-    try:
-        query = data.get('query', '')
-        if query:
-            result = process_calendar_query(query)
-            return jsonify({'result': result})
-        else:
-            action = data.get('action', '')
-            details = data.get('details', '')
-            if not action or not details:
-                return jsonify({'error': 'Missing action or details'}), 400
-                
-            if action == 'add':
-                result = schedule_calendar_event(details)
-            elif action == 'edit':
-                original = data.get('original_event', '')
-                if not original:
-                    return jsonify({'error': 'Missing original event'}), 400
-                result = update_calendar_event(original, details)
-            elif action == 'delete':
-                result = delete_calendar_event(details)
-            elif action == 'view':
-                result = list_calendar_events(details)
-            else:
-                return jsonify({'error': f'Unknown action: {action}'}), 400
-                
-            return jsonify({'result': result})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-# Calendar-specific endpoints
-@api_blueprint.route('/calendar/schedule', methods=['POST'])
-def calendar_schedule_endpoint():
-    """Schedule a new event on Google Calendar."""
-    data = request.json
+    # Work out the call first, so invalid requests get their 400 without importing
+    # calendar_agent (and its Google API dependencies)
+    if query:
+        handler_name, args = 'process_calendar_query', (query,)
+    elif not action or not details:
+        return jsonify({'error': 'Missing action or details'}), 400
+    elif action == 'edit':
+        # Editing also needs to know which event to change
+        original = data.get('original_event')
+        if not original:
+            return jsonify({'error': 'Missing original event'}), 400
+        handler_name, args = 'update_calendar_event', (original, details)
+    else:
+        handler_name = _CAL_ACTIONS.get(action) if isinstance(action, str) else None
+        if handler_name is None:
+            return jsonify({'error': f'Unknown action: {action}'}), 400
+        args = (details,)
     
-    if not data or 'details' not in data:
-        return jsonify({'error': 'No event details provided'}), 400
+    import calendar_agent
+    result = _run_agent(getattr(calendar_agent, handler_name), *args)
     
-    try:
-        details = data['details']
-        result = schedule_calendar_event(details)
-        return jsonify({'result': result})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    # Any of these may have changed events
+    calendar_list_cache.clear()
+    return jsonify({'result': result})
 
-@api_blueprint.route('/calendar/update', methods=['POST'])
-def calendar_update_endpoint():
-    """Update an existing event on Google Calendar."""
-    data = request.json
-    
-    if not data or 'original_event' not in data or 'new_details' not in data:
-        return jsonify({'error': 'Missing event information'}), 400
-    
-    try:
-        original_event = data['original_event']
-        new_details = data['new_details']
-        result = update_calendar_event(original_event, new_details)
-        return jsonify({'result': result})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+# Calendar-specific endpoints that change events: URL and the calendar_agent function
+# applying the change, called with the endpoint's required fields in order
+_CAL_MUTATIONS = {
+    'calendar_schedule_endpoint': ('/calendar/schedule', 'schedule_calendar_event'),
+    'calendar_update_endpoint': ('/calendar/update', 'update_calendar_event'),
+    'calendar_delete_endpoint': ('/calendar/delete', 'delete_calendar_event')
+}
 
-@api_blueprint.route('/calendar/delete', methods=['POST'])
-def calendar_delete_endpoint():
-    """Delete an event from Google Calendar."""
+def _calendar_mutation():
+    """Schedule, update or delete an event on Google Calendar, per _CAL_MUTATIONS."""
     data = request.json
+    fields, _ = _REQUIRED_FIELDS[request.endpoint]
+    _, handler_name = _CAL_MUTATIONS[request.endpoint.rpartition('.')[2]]
     
-    if not data or 'event' not in data:
-        return jsonify({'error': 'No event specified for deletion'}), 400
-    
-    try:
-        event = data['event']
-        result = delete_calendar_event(event)
-        return jsonify({'result': result})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    import calendar_agent
+    result = _run_agent(getattr(calendar_agent, handler_name), *(data[field] for field in fields))
+    calendar_list_cache.clear()
+    return jsonify({'result': result})
+
+for _endpoint, (_rule, _) in _CAL_MUTATIONS.items():
+    api_blueprint.add_url_rule(_rule, _endpoint, _calendar_mutation, methods=['POST'])
 
 @api_blueprint.route('/calendar/list', methods=['POST'])
+@_cache_json_post(calendar_list_cache)
 def calendar_list_endpoint():
     """List events on Google Calendar for a specified time period."""
     data = request.json
     
-    try:
-        time_period = data.get('time_period', 'today')
-        result = list_calendar_events(time_period)
-        return jsonify({'result': result})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    time_period = data.get('time_period', 'today')
+    
+    from calendar_agent import list_calendar_events_result
+    result, is_real = _run_agent(list_calendar_events_result, time_period)
+    return _answer_json({'result': result}, is_real)
 
 @api_blueprint.route('/education', methods=['GET', 'POST'])
 def education_endpoint():
     """Handle education and career guidance queries using the education team."""
-    if request.method == 'GET':
+    if request.method in ('GET', 'HEAD'):
         # For GET requests, return a simple HTML form for testing
-        return '''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Education & Career Guidance</title>
-            <style>
-                body { font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }
-                .container { max-width: 800px; margin: 0 auto; }
-                textarea { width: 100%; height: 120px; margin-bottom: 10px; padding: 8px; }
-                button { padding: 10px 15px; background-color: #4CAF50; color: white; border: none; cursor: pointer; }
-                #response { margin-top: 20px; white-space: pre-wrap; background-color: #f5f5f5; padding: 15px; border-radius: 5px; }
-                .examples { margin: 20px 0; padding: 15px; background-color: #e9f7ef; border-radius: 5px; }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>Education & Career Guidance</h1>
-                <p>Get personalized career advice and course recommendations from our coordinated team of AI advisors.</p>
-                
-                <div class="examples">
-                    <h3>Example queries:</h3>
-                    <ul>
-                        <li>"What courses should I take to become a data scientist?"</li>
-                        <li>"I'm interested in cybersecurity. What career paths are available and what should I study?"</li>
-                        <li>"How can I transition from software engineering to AI research?"</li>
-                        <li>"What are the best resources to learn web development for beginners?"</li>
-                    </ul>
-                </div>
-                
-                <form id="educationForm">
-                    <label for="query">Enter your education or career question:</label><br>
-                    <textarea id="query" name="query" required placeholder="e.g., What courses should I take to become a machine learning engineer?"></textarea><br>
-                    <button type="submit">Get Guidance</button>
-                </form>
-                <div id="loading" style="display: none;">Processing your request... This may take a moment as multiple AI agents are working on your query.</div>
-                <div id="response"></div>
-            </div>
-            
-            <script>
-                document.getElementById('educationForm').addEventListener('submit', function(e) {
-                    e.preventDefault();
-                    
-                    const query = document.getElementById('query').value;
-                    const loadingDiv = document.getElementById('loading');
-                    const responseDiv = document.getElementById('response');
-                    
-                    loadingDiv.style.display = 'block';
-                    responseDiv.innerHTML = '';
-                    
-                    fetch('/api/education', {
-                        method: 'POST',
-                        headers: {
-                            'Content-Type': 'application/json'
-                        },
-                        body: JSON.stringify({ query: query })
-                    })
-                    .then(response => response.json())
-                    .then(data => {
-                        loadingDiv.style.display = 'none';
-                        responseDiv.innerHTML = data.response;
-                    })
-                    .catch(error => {
-                        loadingDiv.style.display = 'none';
-                        responseDiv.innerHTML = 'Error: ' + error;
-                    });
-                });
-            </script>
-        </body>
-        </html>
-        '''
+        return _form_response(_EDUCATION_FORM_HTML)
     
     # Handle POST request
     data = request.json
     
-    if not data or 'query' not in data:
-        return jsonify({'error': 'No query provided'}), 400
+    user_query = data['query']
     
-    try:
-        user_query = data['query']
-        response = get_education_guidance(user_query)
-        return jsonify({'response': response})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    from education_team import get_education_guidance, stream_education_guidance
+    
+    # Clients that accept server-sent events get the answer as it is written
+    if _wants_event_stream():
+        return _sse_response(stream_education_guidance(user_query))
+    
+    response = _run_agent(get_education_guidance, user_query)
+    return _conditional_answer('response', response)
+
+@api_blueprint.route('/education/batch', methods=['POST'])
+def education_batch_endpoint():
+    """Answer several education guidance queries in one request."""
+    from education_team import get_education_guidance
+    return _run_batch(get_education_guidance, request.json)
 
 @api_blueprint.route('/university-courses', methods=['GET', 'POST'])
 def university_courses_endpoint():
     """Handle university course recommendation requests."""
-    if request.method == 'GET':
+    if request.method in ('GET', 'HEAD'):
         # For GET requests, return a simple HTML form for testing
-        return '''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>University Course Recommender</title>
-            <style>
-                body { font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }
-                .container { max-width: 800px; margin: 0 auto; }
-                input, select, textarea { width: 100%; margin-bottom: 10px; padding: 8px; }
-                textarea { height: 100px; }
-                button { padding: 10px 15px; background-color: #4CAF50; color: white; border: none; cursor: pointer; }
-                #response { margin-top: 20px; white-space: pre-wrap; background-color: #f5f5f5; padding: 15px; border-radius: 5px; }
-                .form-group { margin-bottom: 15px; }
-                .tab-content { display: none; }
-                .tab-content.active { display: block; }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>University Course Recommender</h1>
-                <p>Search for courses at specific universities or get personalized recommendations.</p>
-                
-                <div class="tabs">
-                    <button id="tab-search" class="tab-btn active">Search University Courses</button>
-                    <button id="tab-info" class="tab-btn">University Information</button>
-                    <button id="tab-recommend" class="tab-btn">Get Personal Recommendations</button>
-                </div>
-                
-                <div id="search-tab" class="tab-content active">
-                    <h2>Search for University Courses</h2>
-                    <form id="searchForm">
-                        <div class="form-group">
-                            <label for="university">University Name:</label>
-                            <input type="text" id="university" name="university" required placeholder="e.g., Stanford University">
-                        </div>
-                        <div class="form-group">
-                            <label for="subject">Subject or Department (optional):</label>
-                            <input type="text" id="subject" name="subject" placeholder="e.g., Computer Science, Business, Engineering">
-                        </div>
-                        <button type="submit">Search Courses</button>
-                    </form>
-                </div>
-                
-                <div id="info-tab" class="tab-content">
-                    <h2>Get University Information</h2>
-                    <form id="infoForm">
-                        <div class="form-group">
-                            <label for="uni-name">University Name:</label>
-                            <input type="text" id="uni-name" name="uni-name" required placeholder="e.g., Harvard University">
-                        </div>
-                        <button type="submit">Get Information</button>
-                    </form>
-                </div>
-                
-                <div id="recommend-tab" class="tab-content">
-                    <h2>Get Personalized Course Recommendations</h2>
-                    <form id="recommendForm">
-                        <div class="form-group">
-                            <label for="interests">Your Interests:</label>
-                            <textarea id="interests" name="interests" required placeholder="e.g., artificial intelligence, data analysis, machine learning"></textarea>
-                        </div>
-                        <div class="form-group">
-                            <label for="academic-level">Academic Level:</label>
-                            <select id="academic-level" name="academic-level">
-                                <option value="undergraduate">Undergraduate</option>
-                                <option value="graduate">Graduate</option>
-                                <option value="phd">PhD</option>
-                                <option value="professional">Professional/Continuing Education</option>
-                            </select>
-                        </div>
-                        <div class="form-group">
-                            <label for="career-goal">Career Goal (optional):</label>
-                            <input type="text" id="career-goal" name="career-goal" placeholder="e.g., Data Scientist, Software Engineer">
-                        </div>
-                        <div class="form-group">
-                            <label for="specific-university">Specific University (optional):</label>
-                            <input type="text" id="specific-university" name="specific-university" placeholder="e.g., MIT, Stanford">
-                        </div>
-                        <button type="submit">Get Recommendations</button>
-                    </form>
-                </div>
-                
-                <div id="loading" style="display: none;">Processing your request...</div>
-                <div id="response"></div>
-            </div>
-            
-            <script>
-                // Tab switching functionality
-                document.querySelectorAll('.tab-btn').forEach(button => {
-                    button.addEventListener('click', function() {
-                        // Remove active class from all buttons and content divs
-                        document.querySelectorAll('.tab-btn').forEach(btn => btn.classList.remove('active'));
-                        document.querySelectorAll('.tab-content').forEach(content => content.classList.remove('active'));
-                        
-                        // Add active class to clicked button
-                        this.classList.add('active');
-                        
-                        // Determine which tab to show
-                        const tabId = this.id.split('-')[1];
-                        document.getElementById(tabId + '-tab').classList.add('active');
-                    });
-                });
-                
-                // Search form submission
-                document.getElementById('searchForm').addEventListener('submit', function(e) {
-                    e.preventDefault();
-                    
-                    const university = document.getElementById('university').value;
-                    const subject = document.getElementById('subject').value;
-                    
-                    makeApiCall('/api/university-courses/search', {
-                        university: university,
-                        subject: subject
-                    });
-                });
-                
-                // Info form submission
-                document.getElementById('infoForm').addEventListener('submit', function(e) {
-                    e.preventDefault();
-                    
-                    const university = document.getElementById('uni-name').value;
-                    
-                    makeApiCall('/api/university-courses/info', {
-                        university: university
-                    });
-                });
-                
-                // Recommend form submission
-                document.getElementById('recommendForm').addEventListener('submit', function(e) {
-                    e.preventDefault();
-                    
-                    const interests = document.getElementById('interests').value;
-                    const academicLevel = document.getElementById('academic-level').value;
-                    const careerGoal = document.getElementById('career-goal').value;
-                    const specificUniversity = document.getElementById('specific-university').value;
-                    
-                    makeApiCall('/api/university-courses/recommend', {
-                        interests: interests,
-                        academic_level: academicLevel,
-                        career_goal: careerGoal,
-                        specific_university: specificUniversity
-                    });
-                });
-                
-                function makeApiCall(endpoint, data) {
-                    const loadingDiv = document.getElementById('loading');
-                    const responseDiv = document.getElementById('response');
-                    
-                    loadingDiv.style.display = 'block';
-                    responseDiv.innerHTML = '';
-                    
-                    fetch(endpoint, {
-                        method: 'POST',
-                        headers: {
-                            'Content-Type': 'application/json'
-                        },
-                        body: JSON.stringify(data)
-                    })
-                    .then(response => response.json())
-                    .then(data => {
-                        loadingDiv.style.display = 'none';
-                        responseDiv.innerHTML = data.response || data.result || JSON.stringify(data);
-                    })
-                    .catch(error => {
-                        loadingDiv.style.display = 'none';
-                        responseDiv.innerHTML = 'Error: ' + error;
-                    });
-                }
-            </script>
-        </body>
-        </html>
-        '''
+        return _form_response(_UNIVERSITY_COURSES_FORM_HTML)
     
     # Handle POST request - General course recommendation query
     data = request.json
     
-    if not data:
-        return jsonify({'error': 'Missing data'}), 400
+    query = data['query']
+    university = data.get('university', '')
     
-    try:
-        query = data.get('query', '')
-        university = data.get('university', '')
-        
-        if query:
-            from university_course_recommender import UniversityCourseRecommender
-            recommender = UniversityCourseRecommender()
-            response = recommender.get_course_recommendations(query, university)
-            return jsonify({'response': response})
-        else:
-            return jsonify({'error': 'No query provided'}), 400
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    # With a university, the query narrows its courses down; without one, the query
+    # itself names what to search for
+    from university_course_recommender import get_university_courses_result
+    if university:
+        response, is_real = _run_agent(get_university_courses_result, university, query)
+    else:
+        response, is_real = _run_agent(get_university_courses_result, query)
+    return _answer_json({'response': response}, is_real)
 
 @api_blueprint.route('/university-courses/search', methods=['POST'])
 def university_courses_search_endpoint():
     """Search for courses at a specific university."""
     data = request.json
     
-    if not data or 'university' not in data:
-        return jsonify({'error': 'No university specified'}), 400
+    university = data['university']
+    subject = data.get('subject', '')
     
-    try:
-        university = data['university']
-        subject = data.get('subject', '')
-        
-        from university_course_recommender import get_university_courses
-        result = get_university_courses(university, subject)
-        return jsonify({'result': result})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    from university_course_recommender import get_university_courses_result
+    result, is_real = _run_agent(get_university_courses_result, university, subject)
+    return _answer_json({'result': result}, is_real)
 
 @api_blueprint.route('/university-courses/info', methods=['POST'])
 def university_info_endpoint():
     """Get information about a specific university."""
     data = request.json
     
-    if not data or 'university' not in data:
-        return jsonify({'error': 'No university specified'}), 400
+    university = data['university']
     
-    try:
-        university = data['university']
-        
-        from university_course_recommender import get_university_info
-        result = get_university_info(university)
-        return jsonify({'result': result})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    from university_course_recommender import get_university_info_result
+    result, is_real = _run_agent(get_university_info_result, university)
+    return _answer_json({'result': result}, is_real)
 
 @api_blueprint.route('/university-courses/recommend', methods=['POST'])
 def university_recommendations_endpoint():
     """Get personalized course recommendations."""
     data = request.json
     
-    if not data or 'interests' not in data:
-        return jsonify({'error': 'No interests specified'}), 400
+    interests = data['interests']
+    academic_level = data.get('academic_level', 'undergraduate')
+    career_goal = data.get('career_goal', '')
+    specific_university = data.get('specific_university', '')
     
-    try:
-        interests = data['interests']
-        academic_level = data.get('academic_level', 'undergraduate')
-        career_goal = data.get('career_goal', '')
-        specific_university = data.get('specific_university', '')
-        
-        from university_course_recommender import get_personalized_recommendations
-        result = get_personalized_recommendations(interests, academic_level, career_goal, specific_university)
-        return jsonify({'result': result})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+    from university_course_recommender import get_personalized_recommendations_result
+    result, is_real = _run_agent(get_personalized_recommendations_result, interests, academic_level, career_goal, specific_university)
+    return _answer_json({'result': result}, is_real)
\ No newline at end of file
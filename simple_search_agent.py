@@ -7,42 +7,198 @@ Google Search capability. It handles API connection errors gracefully and provid
 when needed.
 """
 import os
-import io
 import re
-from contextlib import redirect_stdout
-from typing import Optional
+import random
+import time
+import asyncio
+import concurrent.futures
+import threading
+import httpx
+from typing import Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
 from agno.agent import Agent
 from agno.models.azure import AzureOpenAI
 from agno.models.openai.chat import OpenAIChat
 from agno.tools.googlesearch import GoogleSearchTools
+from response_cache import ResponseCache
 
 # Load environment variables
 load_dotenv()
 
+# Model provider credentials, read once from the environment
+AZURE_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
+AZURE_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
+AZURE_DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# One pooled HTTP client shared by every OpenAIChat request, so searches reuse keep-alive
+# TLS connections instead of opening a new one per call (OpenAIChat otherwise builds a
+# fresh client for each request). It is sync only: OpenAIChat leaves it out of its async
+# client, but AzureOpenAI would hand it to AsyncAzureOpenAI as well, so the Azure model
+# keeps its own client, which it already reuses between requests. The OpenAI SDK uses
+# this client's timeout in place of its own, so it allows as long as the SDK default
+# (600s) for a completion, with a short connect timeout
+HTTP_CLIENT = httpx.Client(
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    timeout=httpx.Timeout(600, connect=10)
+)
+
+# Worker threads for blocking agent runs started from async code. A dedicated pool keeps
+# search fan-outs from queueing behind (or starving) other users of the loop's default
+# executor; the socket I/O releases the GIL, so threads are enough here
+SEARCH_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=16, thread_name_prefix="search")
+
+# Seconds a search answer is reused for the same query
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "3600"))
+
+# The one cache of search answers, by query (lowercased, whitespace collapsed). Only
+# real answers are cached, never the mock fallback, so callers don't cache on top of it
+_answer_cache = ResponseCache(maxsize=1024, ttl=SEARCH_CACHE_TTL)
+
+# Attempts made for an agent call that keeps failing transiently
+MAX_ATTEMPTS = 3
+
+# HTTP status codes that indicate a transient provider failure worth retrying
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Set SKIP_MODEL_HEALTHCHECK=1 to trust the configured credentials instead of spending a
+# live LLM call on a test prompt whenever a model is created
+SKIP_MODEL_HEALTHCHECK = os.getenv("SKIP_MODEL_HEALTHCHECK") == "1"
+
 # Regular expression to strip ANSI escape sequences
 ANSI_ESCAPE_PATTERN = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
 
+# Patterns used by extract_important_content, compiled once at import
+BOX_LINE_START_PATTERN = re.compile(r'\n\u2503\s*')
+BOX_LINE_END_PATTERN = re.compile(r'\s*\u2503\s*$', re.MULTILINE)
+# str.translate table deleting the whole Unicode box drawing block (U+2500-U+257F)
+BOX_DRAWING_TABLE = dict.fromkeys(range(0x2500, 0x2580))
+# Inline markdown in one alternation; each span keeps its text in a group, link targets,
+# bare [references] and heading markers are dropped
+INLINE_MARKDOWN_PATTERN = re.compile(
+    r'\*\*\*([^*]+)\*\*\*'      # bold italic
+    r'|\*\*([^*]+)\*\*'         # bold
+    r'|\*([^*]+)\*'             # italic
+    r'|`([^`]+)`'               # code
+    r'|#+\s+'                   # heading marker
+    r'|\[([^\]]+)\]\([^\)]+\)'  # [text](url)
+    r'|\]\([^\)]+\)'            # stray link target
+    r'|\[[^\]]+\]'              # [reference]
+)
+MULTISPACE_PATTERN = re.compile(r'\s{2,}')
+FORMATTING_LINE_PATTERN = re.compile(r'^\s*[-•=]+\s*$', re.MULTILINE)
+BULLET_PATTERN = re.compile(r'^\s*[•]\s*', re.MULTILINE)
+BLANK_LINES_PATTERN = re.compile(r'\n{3,}')
+# Anything any of the passes above would change: ANSI escapes, box drawing, bullets,
+# markdown markers, whitespace runs and formatting-only lines. Text without a match
+# is already plain
+NEEDS_CLEANUP_PATTERN = re.compile(r'[\x1B\u2500-\u257F\u2022*`#\[\]]|\s\s|^\s*[-=]+\s*$', re.MULTILINE)
+
+# Canned answers used when no model is available
+MANNHEIM_ML_MOCK_ANSWER = """Before taking a Machine Learning course at the University of Mannheim, it's recommended to complete these prerequisite courses:
+
+1. Introduction to Programming - Learn Python or R fundamentals
+2. Mathematics for Data Scientists - Covers linear algebra and calculus concepts
+3. Statistics and Probability - Essential for understanding ML algorithms
+4. Introduction to Data Analysis - Learn how to prepare and explore data
+
+These courses will provide the necessary foundation before taking specialized Machine Learning courses.
+
+Recommended Path:
+1. First semester: Programming and Math foundations
+2. Second semester: Statistics and Data Analysis
+3. Third semester: Machine Learning and advanced topics
+
+This pathway is recommended by most University of Mannheim data science students."""
+
+GENERIC_MOCK_TEMPLATE = """Based on available information about {query}, I can provide the following response:
+
+This appears to be a mock search response since the real search service is unavailable. For accurate, up-to-date information, please ensure API connections are working.
+
+If this were a real search, you would see relevant information about this topic including latest facts and figures, trusted sources and citations, and summarized content from top search results.
+
+To get real search results:
+1. Check your API key configuration
+2. Verify network connectivity
+3. Ensure the search service endpoints are accessible"""
+
+def _is_transient_error(error):
+    """Return True for provider errors worth retrying (rate limits, timeouts, 5xx)."""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    # Agno's ModelProviderError and the OpenAI SDK errors both carry the HTTP status
+    return getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES
+
+def _run_with_retry(run, *args):
+    """Call run(*args), retrying transient failures with exponential backoff.
+    
+    Waits about 0.5s, then 1s (plus jitter) between the MAX_ATTEMPTS attempts. Any other
+    error, or the last failed attempt, is re-raised so the caller can fall back.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            return run(*args)
+        except Exception as e:
+            if attempt == MAX_ATTEMPTS - 1 or not _is_transient_error(e):
+                raise
+            delay = 0.5 * 2 ** attempt + random.uniform(0, 0.1)
+            print(f"Search agent attempt {attempt+1}/{MAX_ATTEMPTS} failed: {str(e)}. Retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+def _keep_marked_text(match):
+    """Substitution for INLINE_MARKDOWN_PATTERN: the marked-up text, or '' for markers without any.
+    
+    The kept text is cleaned as well, so markers nested inside a span (a heading inside
+    an italic run, bold inside code) are still removed.
+    """
+    if not match.lastindex:
+        return ''
+    return INLINE_MARKDOWN_PATTERN.sub(_keep_marked_text, match.group(match.lastindex))
+
 def strip_ansi_escape_sequences(text):
     """Remove ANSI escape sequences from text."""
+    # Every sequence the pattern matches starts with ESC; most text has none at all
+    if '\x1B' not in text:
+        return text
     return ANSI_ESCAPE_PATTERN.sub('', text)
 
+def _find_response_section(text: str) -> Optional[str]:
+    """Return the body of the "Response" panel, or None if there is no such panel.
+
+    Equivalent to matching r'Response.*?\\n\u2503(.*?)\u2517' with DOTALL, but done with
+    three str.find calls so it runs in linear time regardless of the model output.
+    """
+    start = text.find('Response')
+    if start == -1:
+        return None
+    body_start = text.find('\n\u2503', start + len('Response'))
+    if body_start == -1:
+        return None
+    body_start += 2
+    body_end = text.find('\u2517', body_start)
+    if body_end == -1:
+        return None
+    return text[body_start:body_end]
+
 def extract_important_content(text):
     """Extract only the important content from the formatted response and convert to plain text.
     
     This removes all formatting characters, Unicode box drawing, and other special characters
     to produce clean, human-readable text.
     """
+    # Plain answers (e.g. from Agent.run without any markdown) need no cleanup
+    if not NEEDS_CLEANUP_PATTERN.search(text):
+        return text.strip()
+    
     # First remove ANSI escape sequences
     clean_text = strip_ansi_escape_sequences(text)
     
     # Look for the response section
-    response_match = re.search(r'Response.*?\n\u2503(.*?)\u2517', clean_text, re.DOTALL)
-    if response_match:
-        content = response_match.group(1)
+    content = _find_response_section(clean_text)
+    if content is not None:
         # Remove the box drawing characters at line beginnings and ends
-        content = re.sub(r'\n\u2503\s*', '\n', content)
-        content = re.sub(r'\s*\u2503\s*$', '', content, flags=re.MULTILINE)
+        content = BOX_LINE_START_PATTERN.sub('\n', content)
+        content = BOX_LINE_END_PATTERN.sub('', content)
         # Clean up extra whitespace
         content = content.strip()
     else:
@@ -51,38 +207,33 @@ def extract_important_content(text):
         content = clean_text
     
     # Remove all Unicode box drawing characters
-    content = re.sub(r'[\u2500-\u257F]', '', content)
+    content = content.translate(BOX_DRAWING_TABLE)
     
-    # Remove all markdown formatting symbols (but leave content)
-    content = re.sub(r'#+\s+', '', content)  # Remove heading markers
-    content = re.sub(r'\*\*([^*]+)\*\*', r'\1', content)  # Bold text
-    content = re.sub(r'\*([^*]+)\*', r'\1', content)  # Italic text
-    content = re.sub(r'`([^`]+)`', r'\1', content)  # Code text
+    # Remove markdown formatting symbols (but leave content) and links in a single pass
+    content = INLINE_MARKDOWN_PATTERN.sub(_keep_marked_text, content)
     
     # Convert multiple spaces to single space
-    content = re.sub(r'\s{2,}', ' ', content)
+    content = MULTISPACE_PATTERN.sub(' ', content)
     
     # Remove lines that only contain formatting or whitespace
-    content = re.sub(r'^\s*[-•=]+\s*$', '', content, flags=re.MULTILINE)
+    content = FORMATTING_LINE_PATTERN.sub('', content)
     
     # Convert bullet symbols to plain text
-    content = re.sub(r'^\s*[•]\s*', '- ', content, flags=re.MULTILINE)
-    
-    # Remove any URLs or links formatting
-    content = re.sub(r'\]\([^\)]+\)', '', content)
-    content = re.sub(r'\[[^\]]+\]', '', content)
+    content = BULLET_PATTERN.sub('- ', content)
     
     # Clean up any remaining formatting or special characters
     content = content.replace('\u2022', '-')  # Replace bullet points with simple dash
     
     # Final cleanup of multiple blank lines
-    content = re.sub(r'\n{3,}', '\n\n', content)
+    content = BLANK_LINES_PATTERN.sub('\n\n', content)
     
     return content.strip()
 
 class SearchAgent:
     """Simple search agent with fallback mechanisms."""
     
+    __slots__ = ("agent", "using_real_implementation")
+    
     def __init__(self):
         """Initialize the search agent with the best available model."""
         self.agent = self._create_agent()
@@ -134,26 +285,24 @@ class SearchAgent:
     def _get_azure_model(self):
         """Initialize Azure OpenAI model with error handling."""
         try:
-            api_key = os.getenv("AZURE_OPENAI_API_KEY")
-            endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-            deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o")
-            
-            if not api_key or not endpoint:
+            if not AZURE_API_KEY or not AZURE_ENDPOINT:
                 print("Azure OpenAI credentials missing")
                 return None
                 
-            print(f"Attempting to initialize Azure OpenAI with endpoint: {endpoint}")
+            print(f"Attempting to initialize Azure OpenAI with endpoint: {AZURE_ENDPOINT}")
             model = AzureOpenAI(
-                api_key=api_key,
-                azure_endpoint=endpoint,
-                id=deployment
+                api_key=AZURE_API_KEY,
+                azure_endpoint=AZURE_ENDPOINT,
+                id=AZURE_DEPLOYMENT
             )
             
-            # Test with a simple query to verify connection
+            if SKIP_MODEL_HEALTHCHECK:
+                return model
+            
+            # Test with a simple query to verify connection. Agent.run doesn't print,
+            # so there is no output to capture
             test_agent = Agent(model=model)
-            with io.StringIO() as f:
-                with redirect_stdout(f):
-                    test_agent.print_response("Hello (test message)")
+            _run_with_retry(test_agent.run, "Hello (test message)")
                     
             print("Successfully connected to Azure OpenAI API")
             return model
@@ -164,20 +313,19 @@ class SearchAgent:
     def _get_openai_model(self):
         """Initialize standard OpenAI model with error handling."""
         try:
-            api_key = os.getenv("OPENAI_API_KEY")
-            
-            if not api_key:
+            if not OPENAI_API_KEY:
                 print("OpenAI API key missing")
                 return None
                 
             print("Attempting to initialize standard OpenAI")
-            model = OpenAIChat(api_key=api_key, id="gpt-3.5-turbo")
+            model = OpenAIChat(api_key=OPENAI_API_KEY, id="gpt-3.5-turbo", http_client=HTTP_CLIENT)
+            
+            if SKIP_MODEL_HEALTHCHECK:
+                return model
             
             # Test with a simple query
             test_agent = Agent(model=model)
-            with io.StringIO() as f:
-                with redirect_stdout(f):
-                    test_agent.print_response("Hello (test message)")
+            _run_with_retry(test_agent.run, "Hello (test message)")
                     
             print("Successfully connected to OpenAI API")
             return model
@@ -186,58 +334,133 @@ class SearchAgent:
             return None
     
     def get_response(self, query: str) -> str:
-        """Get a search response for the given query."""
+        """Get a search response for the given query, reusing a recent answer to the same query."""
+        return self.get_result(query)[0]
+    
+    def get_result(self, query: str) -> Tuple[str, bool]:
+        """
+        Get a search response along with whether it came from the agent.
+        
+        Args:
+            query: The search query
+            
+        Returns:
+            (answer, is_real): is_real is False when the answer is the mock fallback
+        """
         if not self.using_real_implementation:
             # Fall back to mock implementation if real agent isn't available
-            return self._mock_response(query)
+            return self._mock_response(query), False
             
+        cache_key = ' '.join(query.lower().split())
+        cached = _answer_cache.get(cache_key)
+        if cached is not None:
+            return cached, True
+        
         try:
-            # Capture the agent's response
-            f = io.StringIO()
-            with redirect_stdout(f):
-                self.agent.print_response(query)
-                
-            response = f.getvalue()
-            # Extract only the important content from the response
-            clean_response = extract_important_content(response)
-            return clean_response
+            # Agent.run returns the answer directly, instead of rendering it to stdout
+            # (process-wide, so concurrent requests could capture each other's output)
+            response = _run_with_retry(self.agent.run, query)
+            # Reduce the markdown to plain text
+            clean_response = extract_important_content(response.content or "")
+            if clean_response:
+                _answer_cache.put(cache_key, clean_response)
+            return clean_response, True
+        except Exception as e:
+            print(f"Error using search agent: {str(e)}")
+            return self._mock_response(query), False
+    
+    async def get_response_async(self, query: str) -> str:
+        """Get a search response without blocking the event loop."""
+        return (await self.get_result_async(query))[0]
+    
+    async def get_result_async(self, query: str) -> Tuple[str, bool]:
+        """Async version of get_result.
+        
+        Runs the sync Agent.run on SEARCH_POOL, which keeps every request on the
+        pooled HTTP_CLIENT.
+        """
+        if not self.using_real_implementation:
+            return self._mock_response(query), False
+            
+        cache_key = ' '.join(query.lower().split())
+        cached = _answer_cache.get(cache_key)
+        if cached is not None:
+            return cached, True
+        
+        try:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(SEARCH_POOL, _run_with_retry, self.agent.run, query)
+            clean_response = extract_important_content(response.content or "")
+            if clean_response:
+                _answer_cache.put(cache_key, clean_response)
+            return clean_response, True
         except Exception as e:
             print(f"Error using search agent: {str(e)}")
-            return self._mock_response(query)
+            return self._mock_response(query), False
+    
+    def stream_response(self, query: str) -> Iterator[str]:
+        """Yield a search response in chunks as the model writes it.
+        
+        The chunks are the model's markdown, not run through extract_important_content,
+        since a chunk can end in the middle of a marker. A cached answer is yielded whole,
+        and a complete answer is cached once the run ends. Falls back to the mock response
+        if no model is available or the agent fails before producing any output; an
+        error after that is raised, as the answer can no longer be replaced.
+        """
+        if not self.using_real_implementation:
+            yield self._mock_response(query)
+            return
+            
+        cache_key = ' '.join(query.lower().split())
+        cached = _answer_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        try:
+            for event in self.agent.run(query, stream=True):
+                if getattr(event, "event", None) == "RunResponseContent" and event.content:
+                    chunks.append(event.content)
+                    yield event.content
+        except Exception as e:
+            if chunks:
+                raise
+            print(f"Error using search agent: {str(e)}")
+            yield self._mock_response(query)
+            return
+        clean_response = extract_important_content(''.join(chunks))
+        if clean_response:
+            _answer_cache.put(cache_key, clean_response)
     
     def _mock_response(self, query: str) -> str:
         """Provide a mock search response when real search isn't available."""
-        if "university of Mannheim" in query.lower() and "machine learning" in query.lower():
-            return """Before taking a Machine Learning course at the University of Mannheim, it's recommended to complete these prerequisite courses:
-
-1. Introduction to Programming - Learn Python or R fundamentals
-2. Mathematics for Data Scientists - Covers linear algebra and calculus concepts
-3. Statistics and Probability - Essential for understanding ML algorithms
-4. Introduction to Data Analysis - Learn how to prepare and explore data
-
-These courses will provide the necessary foundation before taking specialized Machine Learning courses.
-
-Recommended Path:
-1. First semester: Programming and Math foundations
-2. Second semester: Statistics and Data Analysis
-3. Third semester: Machine Learning and advanced topics
-
-This pathway is recommended by most University of Mannheim data science students."""
+        lowered_query = query.lower()
+        if "university of mannheim" in lowered_query and "machine learning" in lowered_query:
+            return MANNHEIM_ML_MOCK_ANSWER
         
-        return f"""Based on available information about {query}, I can provide the following response:
+        return GENERIC_MOCK_TEMPLATE.format(query=query)
 
-This appears to be a mock search response since the real search service is unavailable. For accurate, up-to-date information, please ensure API connections are working.
-
-If this were a real search, you would see relevant information about this topic including latest facts and figures, trusted sources and citations, and summarized content from top search results.
+# The shared search agent, created on first use rather than at import, since creating
+# it sends a test message to each configured model provider
+_search_agent: Optional[SearchAgent] = None
+_search_agent_lock = threading.Lock()
 
-To get real search results:
-1. Check your API key configuration
-2. Verify network connectivity
-3. Ensure the search service endpoints are accessible"""
+def get_search_agent() -> SearchAgent:
+    """Return the shared SearchAgent, creating it the first time it is needed."""
+    global _search_agent
+    if _search_agent is None:
+        with _search_agent_lock:
+            # Another thread may have created it while this one waited for the lock
+            if _search_agent is None:
+                _search_agent = SearchAgent()
+    return _search_agent
 
-# Initialize a global instance of the search agent 
-# so we don't need to create it each time
-search_agent = SearchAgent()
+def __getattr__(name):
+    """Keep `simple_search_agent.search_agent` working for existing callers."""
+    if name == "search_agent":
+        return get_search_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_search_response(query: str) -> str:
     """Get a search response for the given query.
@@ -245,7 +468,33 @@ def get_search_response(query: str) -> str:
     This function is a simple wrapper around the SearchAgent class
     and can be imported directly by other modules.
     """
-    return search_agent.get_response(query)
+    return get_search_agent().get_response(query)
+
+async def get_search_response_async(query: str) -> str:
+    """Async version of get_search_response, for running several searches concurrently."""
+    return await get_search_agent().get_response_async(query)
+
+def get_search_responses(queries: List[str]) -> List[str]:
+    """Get search responses for several queries, running the searches concurrently.
+    
+    The searches run on SEARCH_POOL; repeated queries are only searched once. Responses
+    are returned in the order of the queries.
+    """
+    unique_queries = list(dict.fromkeys(queries))
+    answers = dict(zip(unique_queries, SEARCH_POOL.map(get_search_agent().get_response, unique_queries)))
+    return [answers[query] for query in queries]
+
+async def get_search_responses_async(queries: List[str]) -> List[str]:
+    """Async version of get_search_responses."""
+    unique_queries = list(dict.fromkeys(queries))
+    agent = get_search_agent()
+    responses = await asyncio.gather(*(agent.get_response_async(query) for query in unique_queries))
+    answers = dict(zip(unique_queries, responses))
+    return [answers[query] for query in queries]
+
+def stream_search_response(query: str) -> Iterator[str]:
+    """Stream a search response for the given query as it is generated."""
+    return get_search_agent().stream_response(query)
 
 if __name__ == "__main__":
     # Run interactive mode when script is executed directly
@@ -263,7 +512,7 @@ if __name__ == "__main__":
             
         print("\nSearching...\n")
         try:
-            response = search_agent.get_response(query)
+            response = get_search_response(query)
             print(response)
         except Exception as e:
             print(f"Error: {str(e)}")
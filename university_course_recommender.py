@@ -10,38 +10,137 @@ about universities and their course offerings.
 """
 
 import os
-import io
 import re
-from contextlib import redirect_stdout
-from typing import Optional, Dict, List, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Iterator, List, Any, Tuple
 from dotenv import load_dotenv
 from agno.agent import Agent
 from agno.models.azure import AzureOpenAI
 from agno.models.openai.chat import OpenAIChat
 from agno.tools.googlesearch import GoogleSearchTools
+from response_cache import ResponseCache, SQLiteResponseCache, normalize_query
 
 # Load environment variables
 load_dotenv()
 
+# Model provider credentials, read once from the environment
+AZURE_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
+AZURE_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
+AZURE_DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# Search answers reused for this many seconds, since course catalogs and university
+# facts rarely change within the hour
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", "3600"))
+
+# Set SKIP_MODEL_HEALTHCHECK=1 to trust the configured credentials instead of spending a
+# live LLM call on a test prompt whenever a model is created
+SKIP_MODEL_HEALTHCHECK = os.getenv("SKIP_MODEL_HEALTHCHECK") == "1"
+
+# HTTP status codes meaning the provider rejected the configured credentials
+AUTH_ERROR_STATUS_CODES = {401, 403}
+
+# The agent's system prompt. It is the same for every query (no per-call date, location
+# or user details), so providers that cache prompt prefixes can reuse it across the
+# course, university and recommendation queries
+AGENT_DESCRIPTION = "You are a university course recommendation assistant that helps find and recommend courses from specific universities."
+AGENT_INSTRUCTIONS = (
+    "When asked about a university, search for accurate and up-to-date information about its programs and courses.",
+    "Focus on providing course recommendations based on the specific university mentioned.",
+    "Include details about course prerequisites, admission requirements, and program structure when available.",
+    "Format responses as readable plain text, with short heading lines and '-' bullet points instead of markdown.",
+    "If search results don't provide clear course information, acknowledge this and suggest alternative university resources.",
+    "Always prioritize official university sources over third-party information."
+)
+
+# Set ANSWER_CACHE_DB to a file path to keep the answers in SQLite across restarts
+ANSWER_CACHE_DB = os.getenv("ANSWER_CACHE_DB")
+
+# Agent answers by request kind and normalized inputs, shared by every recommender instance
+if ANSWER_CACHE_DB:
+    _answer_cache = SQLiteResponseCache(ANSWER_CACHE_DB, ttl=ANSWER_CACHE_TTL)
+else:
+    _answer_cache = ResponseCache(maxsize=512, ttl=ANSWER_CACHE_TTL)
+
 # Regular expression to strip ANSI escape sequences
 ANSI_ESCAPE_PATTERN = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
 
-def strip_ansi_escape_sequences(text):
+# Patterns used by extract_important_content, compiled once at import
+RESPONSE_SECTION_PATTERN = re.compile(r'Response.*?\n\u2503(.*?)\u2517', re.DOTALL)
+BOX_LINE_START_PATTERN = re.compile(r'\n\u2503\s*')
+BOX_LINE_END_PATTERN = re.compile(r'\s*\u2503\s*$', re.MULTILINE)
+# str.translate table deleting the whole Unicode box drawing block (U+2500-U+257F)
+BOX_DRAWING_TABLE = dict.fromkeys(range(0x2500, 0x2580))
+# Inline markdown in one alternation; each span keeps its text in a group, heading
+# markers are dropped
+INLINE_MARKDOWN_PATTERN = re.compile(
+    r'\*\*\*([^*]+)\*\*\*'      # bold italic
+    r'|\*\*([^*]+)\*\*'         # bold
+    r'|\*([^*]+)\*'             # italic
+    r'|`([^`]+)`'               # code
+    r'|#+\s+'                   # heading marker
+)
+# Runs of spaces and tabs only; newlines are kept, so paragraphs and list items stay
+# on their own lines
+MULTISPACE_PATTERN = re.compile(r'[ \t]{2,}')
+FORMATTING_LINE_PATTERN = re.compile(r'^\s*[-•=]+\s*$', re.MULTILINE)
+BULLET_PATTERN = re.compile(r'^\s*[•]\s*', re.MULTILINE)
+# Two or more blank (or whitespace-only) lines in a row
+BLANK_LINES_PATTERN = re.compile(r'\n(?:[ \t]*\n){2,}')
+# Anything any of the passes above would change: ANSI escapes, box drawing, bullets,
+# markdown markers, space runs, formatting-only lines and runs of blank lines. Text
+# without a match is already plain
+NEEDS_CLEANUP_PATTERN = re.compile(
+    r'[\x1B\u2500-\u257F\u2022*`#]|[ \t]{2}|^\s*[-=]+\s*$|\n(?:[ \t]*\n){2}',
+    re.MULTILINE
+)
+
+def _university_key(university_name: str) -> str:
+    """Cache key for a university name: lowercased, whitespace collapsed.
+    
+    Words are never dropped or reordered, since "Washington University" and "University of
+    Washington" are different schools.
+    """
+    return ' '.join(university_name.lower().split())
+
+def _keep_marked_text(match: re.Match) -> str:
+    """Substitution for INLINE_MARKDOWN_PATTERN: the marked-up text, or '' for a heading marker.
+    
+    The kept text is cleaned as well, so markers nested inside a span (a heading inside
+    an italic run, bold inside code) are still removed.
+    """
+    if not match.lastindex:
+        return ''
+    return INLINE_MARKDOWN_PATTERN.sub(_keep_marked_text, match.group(match.lastindex))
+
+def strip_ansi_escape_sequences(text: str) -> str:
     """Remove ANSI escape sequences from text."""
+    # Every sequence the pattern matches starts with ESC; most text has none at all
+    if '\x1B' not in text:
+        return text
     return ANSI_ESCAPE_PATTERN.sub('', text)
 
-def extract_important_content(text):
-    """Extract only the important content from the formatted response."""
+def extract_important_content(text: str) -> str:
+    """Extract only the important content from the formatted response.
+    
+    The function is fully type-annotated and only uses precompiled patterns, so the
+    module can be compiled with mypyc for deployments where this cleanup is hot.
+    """
+    # Plain answers (e.g. from an agent without markdown) need no cleanup
+    if not NEEDS_CLEANUP_PATTERN.search(text):
+        return text.strip()
+    
     # First remove ANSI escape sequences
     clean_text = strip_ansi_escape_sequences(text)
     
     # Look for the response section
-    response_match = re.search(r'Response.*?\n\u2503(.*?)\u2517', clean_text, re.DOTALL)
+    response_match = RESPONSE_SECTION_PATTERN.search(clean_text)
     if response_match:
         content = response_match.group(1)
         # Remove the box drawing characters at line beginnings and ends
-        content = re.sub(r'\n\u2503\s*', '\n', content)
-        content = re.sub(r'\s*\u2503\s*$', '', content, flags=re.MULTILINE)
+        content = BOX_LINE_START_PATTERN.sub('\n', content)
+        content = BOX_LINE_END_PATTERN.sub('', content)
         # Clean up extra whitespace
         content = content.strip()
     else:
@@ -50,257 +149,31 @@ def extract_important_content(text):
         content = clean_text
     
     # Remove all Unicode box drawing characters
-    content = re.sub(r'[\u2500-\u257F]', '', content)
+    content = content.translate(BOX_DRAWING_TABLE)
     
-    # Remove all markdown formatting symbols (but leave content)
-    content = re.sub(r'#+\s+', '', content)  # Remove heading markers
-    content = re.sub(r'\*\*([^*]+)\*\*', r'\1', content)  # Bold text
-    content = re.sub(r'\*([^*]+)\*', r'\1', content)  # Italic text
-    content = re.sub(r'`([^`]+)`', r'\1', content)  # Code text
+    # Remove all markdown formatting symbols (but leave content) in a single pass
+    content = INLINE_MARKDOWN_PATTERN.sub(_keep_marked_text, content)
     
-    # Convert multiple spaces to single space
-    content = re.sub(r'\s{2,}', ' ', content)
+    # Convert multiple spaces and tabs to a single space
+    content = MULTISPACE_PATTERN.sub(' ', content)
     
     # Remove lines that only contain formatting or whitespace
-    content = re.sub(r'^\s*[-•=]+\s*$', '', content, flags=re.MULTILINE)
+    content = FORMATTING_LINE_PATTERN.sub('', content)
     
     # Convert bullet symbols to plain text
-    content = re.sub(r'^\s*[•]\s*', '- ', content, flags=re.MULTILINE)
+    content = BULLET_PATTERN.sub('- ', content)
     
     # Clean up any remaining formatting or special characters
     content = content.replace('\u2022', '-')  # Replace bullet points with simple dash
     
     # Final cleanup of multiple blank lines
-    content = re.sub(r'\n{3,}', '\n\n', content)
+    content = BLANK_LINES_PATTERN.sub('\n\n', content)
     
     return content.strip()
 
-class UniversityCourseRecommender:
-    """
-    A specialized agent for searching university information and recommending courses
-    using Google Search tools from the Agno toolkit.
-    """
-    
-    def __init__(self):
-        """Initialize the university course recommender with the best available model."""
-        self.agent = self._create_agent()
-        self.using_real_implementation = self.agent is not None
-        print(f"University Course Recommender initialized. Using real API: {self.using_real_implementation}")
-        
-    def _create_agent(self) -> Optional[Agent]:
-        """Create and configure the agent with appropriate model and tools."""
-        model = self._get_best_available_model()
-        
-        if model is None:
-            return None
-            
-        try:
-            return Agent(
-                model=model,
-                tools=[GoogleSearchTools()],
-                description="You are a university course recommendation assistant that helps find and recommend courses from specific universities.",
-                instructions=[
-                    "When asked about a university, search for accurate and up-to-date information about its programs and courses.",
-                    "Focus on providing course recommendations based on the specific university mentioned.",
-                    "Include details about course prerequisites, admission requirements, and program structure when available.",
-                    "Format responses in a readable way with headings and bullet points for better readability.",
-                    "If search results don't provide clear course information, acknowledge this and suggest alternative university resources.",
-                    "Always prioritize official university sources over third-party information."
-                ],
-                markdown=True,
-                show_tool_calls=False  # Hide the search process in the response
-            )
-        except Exception as e:
-            print(f"Error creating university course recommender agent: {str(e)}")
-            return None
-        
-    def _get_best_available_model(self):
-        """Try different model providers in order of preference."""
-        # Try Azure OpenAI first
-        azure_model = self._get_azure_model()
-        if azure_model:
-            return azure_model
-            
-        # Then try standard OpenAI
-        openai_model = self._get_openai_model()
-        if openai_model:
-            return openai_model
-            
-        # Return None if no models are available
-        print("No language models available. Will use mock responses.")
-        return None
-        
-    def _get_azure_model(self):
-        """Initialize Azure OpenAI model with error handling."""
-        try:
-            api_key = os.getenv("AZURE_OPENAI_API_KEY")
-            endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-            deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o")
-            
-            if not api_key or not endpoint:
-                print("Azure OpenAI credentials missing")
-                return None
-                
-            print(f"Attempting to initialize Azure OpenAI with endpoint: {endpoint}")
-            model = AzureOpenAI(
-                api_key=api_key,
-                azure_endpoint=endpoint,
-                id=deployment
-            )
-            
-            # Test with a simple query to verify connection
-            test_agent = Agent(model=model)
-            with io.StringIO() as f:
-                with redirect_stdout(f):
-                    test_agent.print_response("Hello (test message)")
-                    
-            print("Successfully connected to Azure OpenAI API")
-            return model
-        except Exception as e:
-            print(f"Azure OpenAI connection failed: {str(e)}")
-            return None
-            
-    def _get_openai_model(self):
-        """Initialize standard OpenAI model with error handling."""
-        try:
-            api_key = os.getenv("OPENAI_API_KEY")
-            
-            if not api_key:
-                print("OpenAI API key missing")
-                return None
-                
-            print("Attempting to initialize standard OpenAI")
-            model = OpenAIChat(api_key=api_key, id="gpt-3.5-turbo")
-            
-            # Test with a simple query
-            test_agent = Agent(model=model)
-            with io.StringIO() as f:
-                with redirect_stdout(f):
-                    test_agent.print_response("Hello (test message)")
-                    
-            print("Successfully connected to OpenAI API")
-            return model
-        except Exception as e:
-            print(f"OpenAI connection failed: {str(e)}")
-            return None
-    
-    def search_university_courses(self, university_name: str, field_of_study: str = None) -> str:
-        """
-        Search for courses offered by a specific university, optionally filtered by field of study.
-        
-        Args:
-            university_name (str): The name of the university to search for
-            field_of_study (str, optional): Specific field or discipline to search for
-        
-        Returns:
-            str: Formatted recommendations for courses at the specified university
-        """
-        if not self.using_real_implementation:
-            # Fall back to mock implementation if real agent isn't available
-            return self._mock_course_recommendations(university_name, field_of_study)
-            
-        try:
-            # Construct query based on whether field_of_study is provided
-            if field_of_study:
-                query = f"Find {field_of_study} courses and programs at {university_name}. Include requirements, curriculum, and admission details."
-            else:
-                query = f"What are the best courses and degree programs offered by {university_name}? Include information about popular majors, unique programs, and admission requirements."
-            
-            # Capture the agent's response
-            f = io.StringIO()
-            with redirect_stdout(f):
-                self.agent.print_response(query)
-                
-            response = f.getvalue()
-            # Extract only the important content from the response
-            clean_response = extract_important_content(response)
-            return clean_response
-        except Exception as e:
-            print(f"Error using university course recommender agent: {str(e)}")
-            return self._mock_course_recommendations(university_name, field_of_study)
-    
-    def get_university_info(self, university_name: str) -> str:
-        """
-        Get general information about a university using Google Search.
-        
-        Args:
-            university_name (str): The name of the university to search for
-        
-        Returns:
-            str: Formatted information about the university
-        """
-        if not self.using_real_implementation:
-            # Fall back to mock implementation if real agent isn't available
-            return self._mock_university_info(university_name)
-            
-        try:
-            query = f"Information about {university_name}. Include location, ranking, history, and notable programs."
-            
-            # Capture the agent's response
-            f = io.StringIO()
-            with redirect_stdout(f):
-                self.agent.print_response(query)
-                
-            response = f.getvalue()
-            # Extract only the important content from the response
-            clean_response = extract_important_content(response)
-            return clean_response
-        except Exception as e:
-            print(f"Error fetching university information: {str(e)}")
-            return self._mock_university_info(university_name)
-    
-    def recommend_courses(self, university_name: str, student_interests: str = None, 
-                         academic_level: str = "undergraduate", 
-                         career_goals: str = None) -> str:
-        """
-        Provide personalized course recommendations for a specific university.
-        
-        Args:
-            university_name (str): The name of the university
-            student_interests (str, optional): Student's interests or preferred fields
-            academic_level (str, optional): "undergraduate", "graduate", or "phd"
-            career_goals (str, optional): Student's career objectives
-            
-        Returns:
-            str: Personalized course recommendations
-        """
-        if not self.using_real_implementation:
-            # Fall back to mock implementation if real agent isn't available
-            return self._mock_personalized_recommendations(university_name, student_interests, 
-                                                         academic_level, career_goals)
-            
-        try:
-            # Build a detailed query incorporating all relevant parameters
-            query_parts = [f"Recommend {academic_level} courses at {university_name}"]
-            
-            if student_interests:
-                query_parts.append(f"for a student interested in {student_interests}")
-                
-            if career_goals:
-                query_parts.append(f"who wants to pursue a career in {career_goals}")
-                
-            query_parts.append("Include course descriptions, prerequisites, career opportunities, and why these courses are recommended.")
-            query = " ".join(query_parts)
-            
-            # Capture the agent's response
-            f = io.StringIO()
-            with redirect_stdout(f):
-                self.agent.print_response(query)
-                
-            response = f.getvalue()
-            # Extract only the important content from the response
-            clean_response = extract_important_content(response)
-            return clean_response
-        except Exception as e:
-            print(f"Error generating personalized recommendations: {str(e)}")
-            return self._mock_personalized_recommendations(university_name, student_interests, 
-                                                         academic_level, career_goals)
-    
-    def _mock_course_recommendations(self, university_name: str, field_of_study: str = None) -> str:
-        """Provide a mock course recommendation when real search isn't available."""
-        if "mannheim" in university_name.lower():
-            if field_of_study and "data" in field_of_study.lower():
-                return f"""
+# Canned answers used when no model is available. The *_TEMPLATE strings are filled
+# in with str.format
+MANNHEIM_DATA_COURSES_MOCK = """
 # Data Science Courses at University of Mannheim
 
 The University of Mannheim offers several excellent data science and analytics programs:
@@ -329,8 +202,8 @@ The University of Mannheim offers several excellent data science and analytics p
 
 For the most up-to-date information, visit the official University of Mannheim website or contact their admissions office.
 """
-            else:
-                return f"""
+
+MANNHEIM_COURSES_MOCK = """
 # Recommended Courses at University of Mannheim
 
 The University of Mannheim is renowned for its programs in business, economics, and social sciences. Here are some of their standout programs:
@@ -367,10 +240,8 @@ The University of Mannheim is renowned for its programs in business, economics,
 
 For the most current information, visit the university's official website.
 """
-                
-        # Generic response for other universities
-        university_field_text = f" in {field_of_study}" if field_of_study else ""
-        return f"""
+
+GENERIC_COURSES_MOCK_TEMPLATE = """
 # Recommended Courses at {university_name}
 
 This is a mock response as I don't have real-time information about {university_name}'s courses{university_field_text}.
@@ -383,10 +254,7 @@ To get accurate course recommendations:
 For real course recommendations, please ensure the search API connections are properly configured.
 """
 
-    def _mock_university_info(self, university_name: str) -> str:
-        """Provide mock university information when real search isn't available."""
-        if "mannheim" in university_name.lower():
-            return """
+MANNHEIM_INFO_MOCK = """
 # University of Mannheim
 
 ## Overview
@@ -431,8 +299,8 @@ The University of Mannheim is one of Germany's leading research universities, pa
 
 This information represents typical details about the University of Mannheim but may not reflect the most current information.
 """
-        # Generic response for other universities
-        return f"""
+
+GENERIC_INFO_MOCK_TEMPLATE = """
 # {university_name}
 
 This is a mock response as I don't have real-time information about {university_name}.
@@ -445,17 +313,8 @@ To get accurate information about this university:
 For real university information, please ensure the search API connections are properly configured.
 """
 
-    def _mock_personalized_recommendations(self, university_name: str, student_interests: str = None, 
-                                          academic_level: str = "undergraduate", 
-                                          career_goals: str = None) -> str:
-        """Provide mock personalized recommendations when real search isn't available."""
-        interests_text = f" in {student_interests}" if student_interests else ""
-        career_text = f" for a career in {career_goals}" if career_goals else ""
-        
-        if "mannheim" in university_name.lower():
-            if student_interests and "data" in student_interests.lower():
-                return f"""
-# Personalized {academic_level.title()} Course Recommendations at University of Mannheim{interests_text}{career_text}
+MANNHEIM_DATA_RECOMMENDATIONS_MOCK_TEMPLATE = """
+# Personalized {academic_level} Course Recommendations at University of Mannheim{interests_text}{career_text}
 
 Based on your interest in data science at University of Mannheim, here are personalized recommendations:
 
@@ -493,13 +352,12 @@ Graduates from this program typically find positions as:
 
 For the most up-to-date and accurate information, please contact the University of Mannheim directly.
 """
-            
-            # Generic Mannheim recommendation
-            return f"""
-# Personalized {academic_level.title()} Course Recommendations at University of Mannheim{interests_text}{career_text}
+
+MANNHEIM_RECOMMENDATIONS_MOCK_TEMPLATE = """
+# Personalized {academic_level} Course Recommendations at University of Mannheim{interests_text}{career_text}
 
 ## Recommended Program
-Based on your profile, the **{academic_level.title()} Program in Business Administration** would be an excellent fit.
+Based on your profile, the **{academic_level} Program in Business Administration** would be an excellent fit.
 
 ## Key Courses to Consider
 1. **Fundamentals of Business Administration**: Essential foundation course
@@ -521,10 +379,9 @@ Based on your profile, the **{academic_level.title()} Program in Business Admini
 
 This represents typical information about programs at Mannheim but may not reflect the most current options.
 """
-        
-        # Generic response for other universities
-        return f"""
-# Personalized {academic_level.title()} Course Recommendations at {university_name}{interests_text}{career_text}
+
+GENERIC_RECOMMENDATIONS_MOCK_TEMPLATE = """
+# Personalized {academic_level} Course Recommendations at {university_name}{interests_text}{career_text}
 
 This is a mock response as I don't have real-time information about courses at {university_name}.
 
@@ -537,8 +394,395 @@ To get personalized course recommendations:
 For real personalized recommendations, please ensure the search API connections are properly configured.
 """
 
-# Create a global instance of the university course recommender
-recommender = UniversityCourseRecommender()
+class UniversityCourseRecommender:
+    """
+    A specialized agent for searching university information and recommending courses
+    using Google Search tools from the Agno toolkit.
+    """
+    
+    def __init__(self):
+        """Initialize the university course recommender with the best available model."""
+        self.agent = self._create_agent()
+        self.using_real_implementation = self.agent is not None
+        print(f"University Course Recommender initialized. Using real API: {self.using_real_implementation}")
+        
+    def _create_agent(self) -> Optional[Agent]:
+        """Create and configure the agent with appropriate model and tools."""
+        model = self._get_best_available_model()
+        
+        if model is None:
+            return None
+            
+        try:
+            return Agent(
+                model=model,
+                tools=[GoogleSearchTools()],
+                description=AGENT_DESCRIPTION,
+                instructions=list(AGENT_INSTRUCTIONS),
+                # Every caller wants plain text (the REPL prints the stream as is), so
+                # don't ask for markdown that extract_important_content strips again
+                markdown=False,
+                show_tool_calls=False  # Hide the search process in the response
+            )
+        except Exception as e:
+            print(f"Error creating university course recommender agent: {str(e)}")
+            return None
+        
+    def _get_best_available_model(self):
+        """Try different model providers in order of preference."""
+        # Try Azure OpenAI first
+        azure_model = self._get_azure_model()
+        if azure_model:
+            return azure_model
+            
+        # Then try standard OpenAI
+        openai_model = self._get_openai_model()
+        if openai_model:
+            return openai_model
+            
+        # Return None if no models are available
+        print("No language models available. Will use mock responses.")
+        return None
+        
+    def _get_azure_model(self):
+        """Initialize Azure OpenAI model with error handling."""
+        try:
+            if not AZURE_API_KEY or not AZURE_ENDPOINT:
+                print("Azure OpenAI credentials missing")
+                return None
+                
+            print(f"Attempting to initialize Azure OpenAI with endpoint: {AZURE_ENDPOINT}")
+            model = AzureOpenAI(
+                api_key=AZURE_API_KEY,
+                azure_endpoint=AZURE_ENDPOINT,
+                id=AZURE_DEPLOYMENT
+            )
+            
+            if SKIP_MODEL_HEALTHCHECK:
+                return model
+            
+            # Test with a simple query to verify connection. Agent.run doesn't print,
+            # so there is no output to capture
+            test_agent = Agent(model=model)
+            test_agent.run("Hello (test message)")
+                    
+            print("Successfully connected to Azure OpenAI API")
+            return model
+        except Exception as e:
+            print(f"Azure OpenAI connection failed: {str(e)}")
+            return None
+            
+    def _get_openai_model(self):
+        """Initialize standard OpenAI model with error handling."""
+        try:
+            if not OPENAI_API_KEY:
+                print("OpenAI API key missing")
+                return None
+                
+            print("Attempting to initialize standard OpenAI")
+            model = OpenAIChat(api_key=OPENAI_API_KEY, id="gpt-3.5-turbo")
+            
+            if SKIP_MODEL_HEALTHCHECK:
+                return model
+            
+            # Test with a simple query
+            test_agent = Agent(model=model)
+            test_agent.run("Hello (test message)")
+                    
+            print("Successfully connected to OpenAI API")
+            return model
+        except Exception as e:
+            print(f"OpenAI connection failed: {str(e)}")
+            return None
+    
+    def _check_credentials_rejected(self, error: Exception) -> None:
+        """Switch to the mock responses if the provider rejected the configured credentials.
+        
+        Without the health check, bad credentials first show up on a real query; there is
+        no point in calling the provider again after that.
+        """
+        if getattr(error, "status_code", None) in AUTH_ERROR_STATUS_CODES:
+            print("Model provider rejected the credentials. Will use mock responses.")
+            self.using_real_implementation = False
+    
+    def _cached_answer(self, query: str, cache_key: tuple) -> str:
+        """
+        Run a query through the agent, reusing a recent answer stored under the same key.
+        
+        Failed runs raise before anything is cached, so mock fallbacks are never stored.
+        
+        Args:
+            query (str): The prompt for the agent
+            cache_key (tuple): The request kind followed by its normalized inputs, so
+                queries differing only in case or spacing share an answer
+        
+        Returns:
+            str: The cleaned agent response
+        """
+        clean_response = _answer_cache.get(cache_key)
+        if clean_response is None:
+            # Agent.run returns the answer directly, instead of rendering it to stdout
+            # (process-wide, so concurrent requests could capture each other's output)
+            try:
+                response = self.agent.run(query)
+            except Exception as e:
+                self._check_credentials_rejected(e)
+                raise
+            # Reduce the markdown to plain text
+            clean_response = extract_important_content(response.content or "")
+            if clean_response:
+                _answer_cache.put(cache_key, clean_response)
+        return clean_response
+    
+    def _streamed_answer(self, query: str, cache_key: tuple) -> Iterator[str]:
+        """
+        Yield the agent's answer in chunks as the model writes it.
+        
+        A recent answer stored under the same key is yielded whole instead. The chunks are
+        the model's markdown, not run through extract_important_content, since a chunk can
+        end in the middle of a marker; the complete answer is cleaned and cached once the
+        stream ends.
+        
+        Args:
+            query (str): The prompt for the agent
+            cache_key (tuple): The request kind followed by its normalized inputs
+        
+        Yields:
+            str: The next piece of the answer
+        """
+        cached = _answer_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        try:
+            for event in self.agent.run(query, stream=True):
+                if getattr(event, "event", None) == "RunResponseContent" and event.content:
+                    chunks.append(event.content)
+                    yield event.content
+        except Exception as e:
+            self._check_credentials_rejected(e)
+            raise
+        clean_response = extract_important_content("".join(chunks))
+        if clean_response:
+            _answer_cache.put(cache_key, clean_response)
+    
+    @staticmethod
+    def _courses_query(university_name: str, field_of_study: str = None) -> tuple:
+        """Return the agent prompt and the cache key for a course search."""
+        if field_of_study:
+            query = f"Find {field_of_study} courses and programs at {university_name}. Include requirements, curriculum, and admission details."
+        else:
+            query = f"What are the best courses and degree programs offered by {university_name}? Include information about popular majors, unique programs, and admission requirements."
+        return query, ("courses", _university_key(university_name), normalize_query(field_of_study or ""))
+    
+    def search_university_courses(self, university_name: str, field_of_study: str = None) -> str:
+        """
+        Search for courses offered by a specific university, optionally filtered by field of study.
+        
+        Args:
+            university_name (str): The name of the university to search for
+            field_of_study (str, optional): Specific field or discipline to search for
+        
+        Returns:
+            str: Formatted recommendations for courses at the specified university
+        """
+        return self.search_university_courses_result(university_name, field_of_study)[0]
+    
+    def search_university_courses_result(self, university_name: str, field_of_study: str = None) -> Tuple[str, bool]:
+        """
+        Search for courses like search_university_courses, also telling whether the answer is real.
+        
+        Returns:
+            tuple: The recommendations, and False if they are the mock fallback
+        """
+        if not self.using_real_implementation:
+            # Fall back to mock implementation if real agent isn't available
+            return self._mock_course_recommendations(university_name, field_of_study), False
+            
+        try:
+            return self._cached_answer(*self._courses_query(university_name, field_of_study)), True
+        except Exception as e:
+            print(f"Error using university course recommender agent: {str(e)}")
+            return self._mock_course_recommendations(university_name, field_of_study), False
+    
+    def stream_university_courses(self, university_name: str, field_of_study: str = None) -> Iterator[str]:
+        """
+        Search for courses at a university, yielding the answer as it is written.
+        
+        Falls back to the mock recommendations if no model is available or the agent fails
+        before producing any output; an error after that is raised, as the answer can no
+        longer be replaced.
+        
+        Args:
+            university_name (str): The name of the university to search for
+            field_of_study (str, optional): Specific field or discipline to search for
+        
+        Yields:
+            str: The next piece of the course recommendations
+        """
+        if not self.using_real_implementation:
+            yield self._mock_course_recommendations(university_name, field_of_study)
+            return
+        
+        started = False
+        try:
+            for chunk in self._streamed_answer(*self._courses_query(university_name, field_of_study)):
+                started = True
+                yield chunk
+        except Exception as e:
+            if started:
+                raise
+            print(f"Error using university course recommender agent: {str(e)}")
+            yield self._mock_course_recommendations(university_name, field_of_study)
+    
+    def get_university_info(self, university_name: str) -> str:
+        """
+        Get general information about a university using Google Search.
+        
+        Args:
+            university_name (str): The name of the university to search for
+        
+        Returns:
+            str: Formatted information about the university
+        """
+        return self.get_university_info_result(university_name)[0]
+    
+    def get_university_info_result(self, university_name: str) -> Tuple[str, bool]:
+        """
+        Get university information like get_university_info, also telling whether it is real.
+        
+        Returns:
+            tuple: The information, and False if it is the mock fallback
+        """
+        if not self.using_real_implementation:
+            # Fall back to mock implementation if real agent isn't available
+            return self._mock_university_info(university_name), False
+            
+        try:
+            query = f"Information about {university_name}. Include location, ranking, history, and notable programs."
+            
+            return self._cached_answer(query, ("info", _university_key(university_name))), True
+        except Exception as e:
+            print(f"Error fetching university information: {str(e)}")
+            return self._mock_university_info(university_name), False
+    
+    def recommend_courses(self, university_name: str, student_interests: str = None, 
+                         academic_level: str = "undergraduate", 
+                         career_goals: str = None) -> str:
+        """
+        Provide personalized course recommendations for a specific university.
+        
+        Args:
+            university_name (str): The name of the university
+            student_interests (str, optional): Student's interests or preferred fields
+            academic_level (str, optional): "undergraduate", "graduate", or "phd"
+            career_goals (str, optional): Student's career objectives
+            
+        Returns:
+            str: Personalized course recommendations
+        """
+        return self.recommend_courses_result(university_name, student_interests, academic_level, career_goals)[0]
+    
+    def recommend_courses_result(self, university_name: str, student_interests: str = None, 
+                                 academic_level: str = "undergraduate", 
+                                 career_goals: str = None) -> Tuple[str, bool]:
+        """
+        Recommend courses like recommend_courses, also telling whether the answer is real.
+        
+        Returns:
+            tuple: The recommendations, and False if they are the mock fallback
+        """
+        if not self.using_real_implementation:
+            # Fall back to mock implementation if real agent isn't available
+            return self._mock_personalized_recommendations(university_name, student_interests, 
+                                                         academic_level, career_goals), False
+            
+        try:
+            # Build a detailed query incorporating all relevant parameters
+            query_parts = [f"Recommend {academic_level} courses at {university_name}"]
+            
+            if student_interests:
+                query_parts.append(f"for a student interested in {student_interests}")
+                
+            if career_goals:
+                query_parts.append(f"who wants to pursue a career in {career_goals}")
+                
+            query_parts.append("Include course descriptions, prerequisites, career opportunities, and why these courses are recommended.")
+            query = " ".join(query_parts)
+            
+            # Each input is normalized on its own, so swapping interests and goals
+            # doesn't reuse the other answer
+            cache_key = ("recommend", _university_key(university_name), normalize_query(student_interests or ""),
+                         academic_level.lower(), normalize_query(career_goals or ""))
+            return self._cached_answer(query, cache_key), True
+        except Exception as e:
+            print(f"Error generating personalized recommendations: {str(e)}")
+            return self._mock_personalized_recommendations(university_name, student_interests, 
+                                                         academic_level, career_goals), False
+    
+    def _mock_course_recommendations(self, university_name: str, field_of_study: str = None) -> str:
+        """Provide a mock course recommendation when real search isn't available."""
+        if "mannheim" in university_name.lower():
+            if field_of_study and "data" in field_of_study.lower():
+                return MANNHEIM_DATA_COURSES_MOCK
+            else:
+                return MANNHEIM_COURSES_MOCK
+                
+        # Generic response for other universities
+        university_field_text = f" in {field_of_study}" if field_of_study else ""
+        return GENERIC_COURSES_MOCK_TEMPLATE.format(university_name=university_name,
+                                                    university_field_text=university_field_text)
+
+    def _mock_university_info(self, university_name: str) -> str:
+        """Provide mock university information when real search isn't available."""
+        if "mannheim" in university_name.lower():
+            return MANNHEIM_INFO_MOCK
+        # Generic response for other universities
+        return GENERIC_INFO_MOCK_TEMPLATE.format(university_name=university_name)
+
+    def _mock_personalized_recommendations(self, university_name: str, student_interests: str = None, 
+                                          academic_level: str = "undergraduate", 
+                                          career_goals: str = None) -> str:
+        """Provide mock personalized recommendations when real search isn't available."""
+        fields = {
+            "university_name": university_name,
+            "academic_level": academic_level.title(),
+            "interests_text": f" in {student_interests}" if student_interests else "",
+            "career_text": f" for a career in {career_goals}" if career_goals else ""
+        }
+        
+        if "mannheim" in university_name.lower():
+            if student_interests and "data" in student_interests.lower():
+                return MANNHEIM_DATA_RECOMMENDATIONS_MOCK_TEMPLATE.format_map(fields)
+            
+            # Generic Mannheim recommendation
+            return MANNHEIM_RECOMMENDATIONS_MOCK_TEMPLATE.format_map(fields)
+        
+        # Generic response for other universities
+        return GENERIC_RECOMMENDATIONS_MOCK_TEMPLATE.format_map(fields)
+
+# The shared recommender, created on first use rather than at import, since creating
+# it sends a test message to each configured model provider
+_recommender: Optional[UniversityCourseRecommender] = None
+_recommender_lock = threading.Lock()
+
+def get_recommender() -> UniversityCourseRecommender:
+    """Return the shared UniversityCourseRecommender, creating it the first time it is needed."""
+    global _recommender
+    if _recommender is None:
+        with _recommender_lock:
+            # Another thread may have created it while this one waited for the lock
+            if _recommender is None:
+                _recommender = UniversityCourseRecommender()
+    return _recommender
+
+def __getattr__(name):
+    """Keep `university_course_recommender.recommender` working for existing callers."""
+    if name == "recommender":
+        return get_recommender()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_university_courses(university_name: str, field_of_study: str = None) -> str:
     """
@@ -551,7 +795,20 @@ def get_university_courses(university_name: str, field_of_study: str = None) ->
     Returns:
         Formatted recommendations for courses at the specified university
     """
-    return recommender.search_university_courses(university_name, field_of_study)
+    return get_recommender().search_university_courses(university_name, field_of_study)
+
+def stream_university_courses(university_name: str, field_of_study: str = None) -> Iterator[str]:
+    """
+    Search for courses offered by a specific university, yielding the answer as it is generated.
+    
+    Args:
+        university_name: The name of the university to search for
+        field_of_study: Optional specific field or discipline to search for
+        
+    Returns:
+        Iterator over the pieces of the course recommendations
+    """
+    return get_recommender().stream_university_courses(university_name, field_of_study)
 
 def get_university_info(university_name: str) -> str:
     """
@@ -563,7 +820,7 @@ def get_university_info(university_name: str) -> str:
     Returns:
         Formatted information about the university
     """
-    return recommender.get_university_info(university_name)
+    return get_recommender().get_university_info(university_name)
 
 def get_personalized_recommendations(university_name: str, student_interests: str = None, 
                                     academic_level: str = "undergraduate", 
@@ -580,7 +837,21 @@ def get_personalized_recommendations(university_name: str, student_interests: st
     Returns:
         Personalized course recommendations
     """
-    return recommender.recommend_courses(university_name, student_interests, academic_level, career_goals)
+    return get_recommender().recommend_courses(university_name, student_interests, academic_level, career_goals)
+
+def get_university_courses_result(university_name: str, field_of_study: str = None) -> Tuple[str, bool]:
+    """Search for courses like get_university_courses; the flag is False for the mock fallback."""
+    return get_recommender().search_university_courses_result(university_name, field_of_study)
+
+def get_university_info_result(university_name: str) -> Tuple[str, bool]:
+    """Get university information like get_university_info; the flag is False for the mock fallback."""
+    return get_recommender().get_university_info_result(university_name)
+
+def get_personalized_recommendations_result(university_name: str, student_interests: str = None, 
+                                           academic_level: str = "undergraduate", 
+                                           career_goals: str = None) -> Tuple[str, bool]:
+    """Recommend courses like get_personalized_recommendations; the flag is False for the mock fallback."""
+    return get_recommender().recommend_courses_result(university_name, student_interests, academic_level, career_goals)
 
 if __name__ == "__main__":
     # Run interactive mode when script is executed directly
@@ -589,6 +860,10 @@ if __name__ == "__main__":
     print("This tool helps you find course recommendations from specific universities.")
     print("Type 'exit' to quit.")
     
+    # Fetches the university information in the background while the user is still
+    # answering whether they want it
+    prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+    
     while True:
         university = input("\nEnter university name (or 'exit' to quit): ")
         
@@ -600,17 +875,20 @@ if __name__ == "__main__":
         
         print("\nSearching for courses...\n")
         try:
-            if field:
-                response = get_university_courses(university, field)
-            else:
-                response = get_university_courses(university)
-            print(response)
+            # Print the answer as it is written instead of waiting for all of it
+            for chunk in stream_university_courses(university, field or None):
+                print(chunk, end="", flush=True)
+            print()
+            
+            # Start on the university information now; if it isn't wanted, the answer
+            # is still cached for the next question about this university
+            info_future = prefetch_pool.submit(get_university_info, university)
             
             # Ask if they want more detailed info
             more_info = input("\nWould you like general information about this university? (yes/no): ")
             if more_info.lower() == 'yes':
                 print("\nFetching university information...\n")
-                info = get_university_info(university)
+                info = info_future.result()
                 print(info)
                 
             # Ask if they want personalized recommendations